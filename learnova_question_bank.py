@@ -0,0 +1,238 @@
+# ============================================================================
+# LEARNOVA - Question Bank, Teaching Modes and Badges
+# ============================================================================
+# The source data for the quiz engine in learnova_quiz.py. Edit questions,
+# modes and badges here. learnova_quiz.py imports this module the first time
+# it needs the data, not when it is imported itself.
+# ============================================================================
+
+
+# ============================================================================
+# SECTION 1: DATA - Question Bank
+# ============================================================================
+# Questions are stored as a list of dictionaries. Each dictionary contains:
+#   - "q"           : The question text (string)
+#   - "options"     : A list of 4 answer choices (list of strings)
+#   - "ans"         : The correct answer letter - A, B, C, or D (string)
+#   - "explanation" : Why the correct answer is right (string)
+#   - "difficulty"  : 1 = Easy, 2 = Medium, 3 = Hard (integer)
+#   - "topic"       : The subject category (string)
+# ============================================================================
+
+QUESTION_BANK = [
+    {
+        "q": "What does AI stand for?",
+        "options": ["A) Automated Intelligence", "B) Artificial Intelligence",
+                     "C) Applied Information", "D) Advanced Integration"],
+        "ans": "B",
+        "explanation": "AI stands for Artificial Intelligence - the simulation of human intelligence by machines and computer systems.",
+        "difficulty": 1,
+        "topic": "Technology"
+    },
+    {
+        "q": "Which planet is known as the Red Planet?",
+        "options": ["A) Venus", "B) Jupiter", "C) Mars", "D) Saturn"],
+        "ans": "C",
+        "explanation": "Mars appears red due to iron oxide (rust) on its surface, giving it the nickname 'The Red Planet'.",
+        "difficulty": 1,
+        "topic": "Science"
+    },
+    {
+        "q": "What is the largest organ in the human body?",
+        "options": ["A) Liver", "B) Brain", "C) Heart", "D) Skin"],
+        "ans": "D",
+        "explanation": "The skin is the largest organ, covering about 20 square feet in adults and serving as a protective barrier.",
+        "difficulty": 1,
+        "topic": "Science"
+    },
+    {
+        "q": "In Python, which data type is used to store a sequence of characters?",
+        "options": ["A) int", "B) float", "C) str", "D) bool"],
+        "ans": "C",
+        "explanation": "The 'str' (string) data type in Python is used to store text - a sequence of characters.",
+        "difficulty": 1,
+        "topic": "Programming"
+    },
+    {
+        "q": "What does the 'def' keyword do in Python?",
+        "options": ["A) Defines a variable", "B) Defines a function",
+                     "C) Defines a class", "D) Deletes a file"],
+        "ans": "B",
+        "explanation": "The 'def' keyword is used to define (create) a function in Python.",
+        "difficulty": 1,
+        "topic": "Programming"
+    },
+    {
+        "q": "Which gas do plants absorb from the atmosphere during photosynthesis?",
+        "options": ["A) Oxygen", "B) Nitrogen", "C) Carbon Dioxide", "D) Hydrogen"],
+        "ans": "C",
+        "explanation": "Plants absorb carbon dioxide (CO2) and use sunlight to convert it into glucose and oxygen.",
+        "difficulty": 2,
+        "topic": "Science"
+    },
+    {
+        "q": "What is the time complexity of searching in a Python dictionary?",
+        "options": ["A) O(n)", "B) O(log n)", "C) O(1)", "D) O(n^2)"],
+        "ans": "C",
+        "explanation": "Python dictionaries use hash tables, providing average O(1) constant-time lookups.",
+        "difficulty": 3,
+        "topic": "Programming"
+    },
+    {
+        "q": "Which country has the largest population in the world as of 2024?",
+        "options": ["A) China", "B) United States", "C) Indonesia", "D) India"],
+        "ans": "D",
+        "explanation": "India surpassed China in 2023 to become the world's most populous country with over 1.4 billion people.",
+        "difficulty": 2,
+        "topic": "General Knowledge"
+    },
+    {
+        "q": "What does HTML stand for?",
+        "options": ["A) Hyper Text Markup Language", "B) High Tech Modern Language",
+                     "C) Hyper Transfer Markup Language", "D) Home Tool Markup Language"],
+        "ans": "A",
+        "explanation": "HTML stands for Hyper Text Markup Language - the standard language for creating web pages.",
+        "difficulty": 1,
+        "topic": "Technology"
+    },
+    {
+        "q": "Which of the following is NOT a valid Python loop?",
+        "options": ["A) for loop", "B) while loop", "C) do-while loop", "D) nested loop"],
+        "ans": "C",
+        "explanation": "Python does not have a do-while loop. It uses 'for' and 'while' loops. Nested loops are loops inside loops.",
+        "difficulty": 2,
+        "topic": "Programming"
+    },
+    {
+        "q": "What is the chemical symbol for gold?",
+        "options": ["A) Go", "B) Gd", "C) Au", "D) Ag"],
+        "ans": "C",
+        "explanation": "Gold's chemical symbol 'Au' comes from the Latin word 'aurum' meaning gold.",
+        "difficulty": 2,
+        "topic": "Science"
+    },
+    {
+        "q": "In gamification, what does 'XP' typically stand for?",
+        "options": ["A) Extra Points", "B) Experience Points",
+                     "C) Extreme Performance", "D) Exchange Points"],
+        "ans": "B",
+        "explanation": "XP stands for Experience Points - a unit of measurement used in games to quantify a player's progression.",
+        "difficulty": 1,
+        "topic": "Technology"
+    },
+    {
+        "q": "Which Python method is used to add an item to the end of a list?",
+        "options": ["A) .add()", "B) .insert()", "C) .append()", "D) .push()"],
+        "ans": "C",
+        "explanation": "The .append() method adds a single item to the end of a Python list.",
+        "difficulty": 2,
+        "topic": "Programming"
+    },
+    {
+        "q": "What percentage of the Earth's surface is covered by water?",
+        "options": ["A) 51%", "B) 61%", "C) 71%", "D) 81%"],
+        "ans": "C",
+        "explanation": "Approximately 71% of Earth's surface is covered by water, with oceans holding about 96.5% of it.",
+        "difficulty": 2,
+        "topic": "Science"
+    },
+    {
+        "q": "Which sorting algorithm has the best average-case time complexity?",
+        "options": ["A) Bubble Sort - O(n^2)", "B) Merge Sort - O(n log n)",
+                     "C) Selection Sort - O(n^2)", "D) Insertion Sort - O(n^2)"],
+        "ans": "B",
+        "explanation": "Merge Sort has O(n log n) average-case complexity, making it more efficient than O(n^2) algorithms.",
+        "difficulty": 3,
+        "topic": "Programming"
+    },
+]
+
+
+# ============================================================================
+# SECTION 2: TEACHING MODES
+# ============================================================================
+# Learnova's Teaching Modes adapt the quiz experience to different classroom
+# dynamics. Each mode changes the quiz behavior, timing, and feedback style.
+# Stored as a dictionary where keys are mode numbers and values are
+# dictionaries containing the mode's name, description, and settings.
+# ============================================================================
+
+TEACHING_MODES = {
+    1: {
+        "name": "Focus Mode",
+        "icon": "[*]",
+        "description": "Deep concentration. No timer pressure. Detailed explanations after each question.",
+        "timed": False,
+        "time_per_question": 0,       # No time limit
+        "show_explanation": True,      # Show explanation after every question
+        "show_hints": True,            # Offer hints
+        "xp_multiplier": 1.0,         # Standard XP
+        "feedback": "standard"
+    },
+    2: {
+        "name": "Explore Mode",
+        "icon": "[?]",
+        "description": "Discovery-based. See explanations for ALL answers. Learn from mistakes.",
+        "timed": False,
+        "time_per_question": 0,
+        "show_explanation": True,      # Always show explanations
+        "show_hints": True,
+        "xp_multiplier": 1.0,
+        "feedback": "standard"
+    },
+    3: {
+        "name": "Pressure Mode",
+        "icon": "[!]",
+        "description": "Timed challenge! 15 seconds per question. Bonus XP for speed.",
+        "timed": True,
+        "time_per_question": 15,       # 15 seconds per question
+        "show_explanation": False,     # No explanations during quiz
+        "show_hints": False,           # No hints
+        "xp_multiplier": 1.5,         # 50% bonus XP for the challenge
+        "feedback": "standard"
+    },
+    4: {
+        "name": "Team Mode",
+        "icon": "[T]",
+        "description": "Collaborative play. Discuss answers with your team. Double XP!",
+        "timed": False,
+        "time_per_question": 0,
+        "show_explanation": True,
+        "show_hints": True,
+        "xp_multiplier": 2.0,         # Double XP for teamwork
+        "feedback": "standard"
+    },
+    5: {
+        "name": "Recovery Mode",
+        "icon": "[~]",
+        "description": "Low-pressure review. Hints available. Encouragement after every answer.",
+        "timed": False,
+        "time_per_question": 0,
+        "show_explanation": True,
+        "show_hints": True,
+        "xp_multiplier": 1.0,
+        "feedback": "encouraging"     # Extra encouragement after every answer
+    }
+}
+
+
+# ============================================================================
+# SECTION 3: BADGE DEFINITIONS
+# ============================================================================
+# Badges reward specific achievements during the quiz. Each badge has a name,
+# icon, and description. Badges are awarded after the quiz based on
+# performance metrics tracked during gameplay.
+# ============================================================================
+
+BADGES = {
+    "perfect_score":   {"name": "Perfect Score",   "icon": "[S]", "desc": "Answered every question correctly"},
+    "quick_thinker":   {"name": "Quick Thinker",   "icon": "[Q]", "desc": "Completed the quiz in under 2 minutes"},
+    "no_mistakes":     {"name": "Flawless",         "icon": "[F]", "desc": "Zero wrong answers on first try"},
+    "curious_mind":    {"name": "Curious Mind",     "icon": "[C]", "desc": "Read all explanations (Focus/Explore mode)"},
+    "speed_demon":     {"name": "Speed Demon",      "icon": "[D]", "desc": "Answered 5+ questions in under 5 seconds each"},
+    "halfway_hero":    {"name": "Halfway Hero",     "icon": "[H]", "desc": "Got at least 50% correct"},
+    "streak_master":   {"name": "Streak Master",    "icon": "[M]", "desc": "Got 5 or more correct answers in a row"},
+    "topic_expert":    {"name": "Topic Expert",     "icon": "[E]", "desc": "Got all questions right in at least one topic"},
+    "persistent":      {"name": "Persistent",       "icon": "[P]", "desc": "Played the quiz more than once"},
+    "first_steps":     {"name": "First Steps",      "icon": "[1]", "desc": "Completed your first quiz"},
+}
@@ -14,243 +14,65 @@
 # Date: February 2026
 # ============================================================================
 
+import heapq   # Used to keep each worker's local top scores
+import itertools  # Used for unique leaderboard version stamps
+import json    # Used to write compact session checkpoint records
+import marshal  # Used to save the topic mastery model
+import multiprocessing  # Used to run leaderboard shards and graders in worker processes
+import os      # Used for checkpoint file paths and crash-safe flushing
 import random  # Used to shuffle questions for a unique experience each time
+import struct  # Used to pack session records into bytes
+import sys     # Used for command-line options
 import time    # Used for tracking quiz duration and timed challenges
+import zlib    # Used for stable, short checksums of player names
+from array import array  # Used for compact per-answer and per-student number arrays
+from collections import OrderedDict, deque, namedtuple  # Screen cache, leaderboard expiry, session records
 
 
 # ============================================================================
-# SECTION 1: DATA - Question Bank
-# ============================================================================
-# Questions are stored as a list of dictionaries. Each dictionary contains:
-#   - "q"           : The question text (string)
-#   - "options"     : A list of 4 answer choices (list of strings)
-#   - "ans"         : The correct answer letter - A, B, C, or D (string)
-#   - "explanation" : Why the correct answer is right (string)
-#   - "difficulty"  : 1 = Easy, 2 = Medium, 3 = Hard (integer)
-#   - "topic"       : The subject category (string)
-# ============================================================================
-
-QUESTION_BANK = [
-    {
-        "q": "What does AI stand for?",
-        "options": ["A) Automated Intelligence", "B) Artificial Intelligence",
-                     "C) Applied Information", "D) Advanced Integration"],
-        "ans": "B",
-        "explanation": "AI stands for Artificial Intelligence - the simulation of human intelligence by machines and computer systems.",
-        "difficulty": 1,
-        "topic": "Technology"
-    },
-    {
-        "q": "Which planet is known as the Red Planet?",
-        "options": ["A) Venus", "B) Jupiter", "C) Mars", "D) Saturn"],
-        "ans": "C",
-        "explanation": "Mars appears red due to iron oxide (rust) on its surface, giving it the nickname 'The Red Planet'.",
-        "difficulty": 1,
-        "topic": "Science"
-    },
-    {
-        "q": "What is the largest organ in the human body?",
-        "options": ["A) Liver", "B) Brain", "C) Heart", "D) Skin"],
-        "ans": "D",
-        "explanation": "The skin is the largest organ, covering about 20 square feet in adults and serving as a protective barrier.",
-        "difficulty": 1,
-        "topic": "Science"
-    },
-    {
-        "q": "In Python, which data type is used to store a sequence of characters?",
-        "options": ["A) int", "B) float", "C) str", "D) bool"],
-        "ans": "C",
-        "explanation": "The 'str' (string) data type in Python is used to store text - a sequence of characters.",
-        "difficulty": 1,
-        "topic": "Programming"
-    },
-    {
-        "q": "What does the 'def' keyword do in Python?",
-        "options": ["A) Defines a variable", "B) Defines a function",
-                     "C) Defines a class", "D) Deletes a file"],
-        "ans": "B",
-        "explanation": "The 'def' keyword is used to define (create) a function in Python.",
-        "difficulty": 1,
-        "topic": "Programming"
-    },
-    {
-        "q": "Which gas do plants absorb from the atmosphere during photosynthesis?",
-        "options": ["A) Oxygen", "B) Nitrogen", "C) Carbon Dioxide", "D) Hydrogen"],
-        "ans": "C",
-        "explanation": "Plants absorb carbon dioxide (CO2) and use sunlight to convert it into glucose and oxygen.",
-        "difficulty": 2,
-        "topic": "Science"
-    },
-    {
-        "q": "What is the time complexity of searching in a Python dictionary?",
-        "options": ["A) O(n)", "B) O(log n)", "C) O(1)", "D) O(n^2)"],
-        "ans": "C",
-        "explanation": "Python dictionaries use hash tables, providing average O(1) constant-time lookups.",
-        "difficulty": 3,
-        "topic": "Programming"
-    },
-    {
-        "q": "Which country has the largest population in the world as of 2024?",
-        "options": ["A) China", "B) United States", "C) Indonesia", "D) India"],
-        "ans": "D",
-        "explanation": "India surpassed China in 2023 to become the world's most populous country with over 1.4 billion people.",
-        "difficulty": 2,
-        "topic": "General Knowledge"
-    },
-    {
-        "q": "What does HTML stand for?",
-        "options": ["A) Hyper Text Markup Language", "B) High Tech Modern Language",
-                     "C) Hyper Transfer Markup Language", "D) Home Tool Markup Language"],
-        "ans": "A",
-        "explanation": "HTML stands for Hyper Text Markup Language - the standard language for creating web pages.",
-        "difficulty": 1,
-        "topic": "Technology"
-    },
-    {
-        "q": "Which of the following is NOT a valid Python loop?",
-        "options": ["A) for loop", "B) while loop", "C) do-while loop", "D) nested loop"],
-        "ans": "C",
-        "explanation": "Python does not have a do-while loop. It uses 'for' and 'while' loops. Nested loops are loops inside loops.",
-        "difficulty": 2,
-        "topic": "Programming"
-    },
-    {
-        "q": "What is the chemical symbol for gold?",
-        "options": ["A) Go", "B) Gd", "C) Au", "D) Ag"],
-        "ans": "C",
-        "explanation": "Gold's chemical symbol 'Au' comes from the Latin word 'aurum' meaning gold.",
-        "difficulty": 2,
-        "topic": "Science"
-    },
-    {
-        "q": "In gamification, what does 'XP' typically stand for?",
-        "options": ["A) Extra Points", "B) Experience Points",
-                     "C) Extreme Performance", "D) Exchange Points"],
-        "ans": "B",
-        "explanation": "XP stands for Experience Points - a unit of measurement used in games to quantify a player's progression.",
-        "difficulty": 1,
-        "topic": "Technology"
-    },
-    {
-        "q": "Which Python method is used to add an item to the end of a list?",
-        "options": ["A) .add()", "B) .insert()", "C) .append()", "D) .push()"],
-        "ans": "C",
-        "explanation": "The .append() method adds a single item to the end of a Python list.",
-        "difficulty": 2,
-        "topic": "Programming"
-    },
-    {
-        "q": "What percentage of the Earth's surface is covered by water?",
-        "options": ["A) 51%", "B) 61%", "C) 71%", "D) 81%"],
-        "ans": "C",
-        "explanation": "Approximately 71% of Earth's surface is covered by water, with oceans holding about 96.5% of it.",
-        "difficulty": 2,
-        "topic": "Science"
-    },
-    {
-        "q": "Which sorting algorithm has the best average-case time complexity?",
-        "options": ["A) Bubble Sort - O(n^2)", "B) Merge Sort - O(n log n)",
-                     "C) Selection Sort - O(n^2)", "D) Insertion Sort - O(n^2)"],
-        "ans": "B",
-        "explanation": "Merge Sort has O(n log n) average-case complexity, making it more efficient than O(n^2) algorithms.",
-        "difficulty": 3,
-        "topic": "Programming"
-    },
-]
-
-
-# ============================================================================
-# SECTION 2: TEACHING MODES
-# ============================================================================
-# Learnova's Teaching Modes adapt the quiz experience to different classroom
-# dynamics. Each mode changes the quiz behavior, timing, and feedback style.
-# Stored as a dictionary where keys are mode numbers and values are
-# dictionaries containing the mode's name, description, and settings.
-# ============================================================================
-
-TEACHING_MODES = {
-    1: {
-        "name": "Focus Mode",
-        "icon": "[*]",
-        "description": "Deep concentration. No timer pressure. Detailed explanations after each question.",
-        "timed": False,
-        "time_per_question": 0,       # No time limit
-        "show_explanation": True,      # Show explanation after every question
-        "show_hints": True,            # Offer hints
-        "xp_multiplier": 1.0          # Standard XP
-    },
-    2: {
-        "name": "Explore Mode",
-        "icon": "[?]",
-        "description": "Discovery-based. See explanations for ALL answers. Learn from mistakes.",
-        "timed": False,
-        "time_per_question": 0,
-        "show_explanation": True,      # Always show explanations
-        "show_hints": True,
-        "xp_multiplier": 1.0
-    },
-    3: {
-        "name": "Pressure Mode",
-        "icon": "[!]",
-        "description": "Timed challenge! 15 seconds per question. Bonus XP for speed.",
-        "timed": True,
-        "time_per_question": 15,       # 15 seconds per question
-        "show_explanation": False,     # No explanations during quiz
-        "show_hints": False,           # No hints
-        "xp_multiplier": 1.5          # 50% bonus XP for the challenge
-    },
-    4: {
-        "name": "Team Mode",
-        "icon": "[T]",
-        "description": "Collaborative play. Discuss answers with your team. Double XP!",
-        "timed": False,
-        "time_per_question": 0,
-        "show_explanation": True,
-        "show_hints": True,
-        "xp_multiplier": 2.0          # Double XP for teamwork
-    },
-    5: {
-        "name": "Recovery Mode",
-        "icon": "[~]",
-        "description": "Low-pressure review. Hints available. Encouragement after every answer.",
-        "timed": False,
-        "time_per_question": 0,
-        "show_explanation": True,
-        "show_hints": True,
-        "xp_multiplier": 1.0
-    }
-}
-
-
+# SECTION 1: DATA - Question Bank, Teaching Modes and Badges
 # ============================================================================
-# SECTION 3: BADGE DEFINITIONS
+# The question bank, the teaching modes and the badge definitions are kept in
+# learnova_question_bank.py. They are loaded on first use through
+# get_question_bank(), get_teaching_modes() and get_badges() (Section 12),
+# and are still available as QUESTION_BANK, TEACHING_MODES and BADGES on
+# this module.
 # ============================================================================
-# Badges reward specific achievements during the quiz. Each badge has a name,
-# icon, and description. Badges are awarded after the quiz based on
-# performance metrics tracked during gameplay.
-# ============================================================================
-
-BADGES = {
-    "perfect_score":   {"name": "Perfect Score",   "icon": "[S]", "desc": "Answered every question correctly"},
-    "quick_thinker":   {"name": "Quick Thinker",   "icon": "[Q]", "desc": "Completed the quiz in under 2 minutes"},
-    "no_mistakes":     {"name": "Flawless",         "icon": "[F]", "desc": "Zero wrong answers on first try"},
-    "curious_mind":    {"name": "Curious Mind",     "icon": "[C]", "desc": "Read all explanations (Focus/Explore mode)"},
-    "speed_demon":     {"name": "Speed Demon",      "icon": "[D]", "desc": "Answered 5+ questions in under 5 seconds each"},
-    "halfway_hero":    {"name": "Halfway Hero",     "icon": "[H]", "desc": "Got at least 50% correct"},
-    "streak_master":   {"name": "Streak Master",    "icon": "[M]", "desc": "Got 5 or more correct answers in a row"},
-    "topic_expert":    {"name": "Topic Expert",     "icon": "[E]", "desc": "Got all questions right in at least one topic"},
-    "persistent":      {"name": "Persistent",       "icon": "[P]", "desc": "Played the quiz more than once"},
-    "first_steps":     {"name": "First Steps",      "icon": "[1]", "desc": "Completed your first quiz"},
-}
 
 
 # ============================================================================
-# SECTION 4: DISPLAY FUNCTIONS
+# SECTION 2: DISPLAY FUNCTIONS
 # ============================================================================
 # These functions handle all visual output - printing headers, menus, results,
 # and formatting text for a clean console experience.
+#
+# Leaderboard screens are built as text once and kept in a small screen
+# cache. A leaderboard screen is keyed by the board's version stamp,
+# which changes whenever an entry is added or expires, so a classroom display
+# that refreshes every second only rebuilds the screen after a real change -
+# and then reformats only the rows whose entry moved. The least recently
+# shown screens are dropped once the cache is full.
 # ============================================================================
 
+SCREEN_CACHE = OrderedDict()   # Screen key -> finished screen text, oldest first
+SCREEN_CACHE_SIZE = 64         # Screens kept before the least recent is dropped
+
+
+def _cached_screen(key):
+    """Return a cached screen (marking it as recently used), or None."""
+    screen = SCREEN_CACHE.get(key)
+    if screen is not None:
+        SCREEN_CACHE.move_to_end(key)
+    return screen
+
+
+def _store_screen(key, screen):
+    """Cache a finished screen, dropping the least recently used if full."""
+    SCREEN_CACHE[key] = screen
+    if len(SCREEN_CACHE) > SCREEN_CACHE_SIZE:
+        SCREEN_CACHE.popitem(last=False)
+
+
 def print_banner():
     """Display the Learnova welcome banner with ASCII art styling."""
     print("\n" + "=" * 60)
@@ -278,7 +100,7 @@ def display_teaching_modes():
     print("=" * 60)
 
     # Loop through each mode in the dictionary
-    for mode_num, mode_info in TEACHING_MODES.items():
+    for mode_num, mode_info in get_teaching_modes().items():
         print(f"\n  {mode_num}. {mode_info['icon']} {mode_info['name']}")
         print(f"     {mode_info['description']}")
         if mode_info["timed"]:
@@ -288,47 +110,109 @@ def display_teaching_modes():
     print("\n" + "-" * 60)
 
 
-def display_leaderboard(leaderboard):
+def display_leaderboard(board, now=None):
     """
-    Display the leaderboard showing top scores from all sessions.
-    Takes a list of dictionaries, each containing player name, score, and XP.
-    Sorts by XP in descending order and prints a formatted table.
+    Display the top 10 scores of a ranked leaderboard.
+    Takes a board from create_rank_board() (see Section 10). The board keeps
+    its entries ranked by XP, so no sorting is needed here.
     """
-    if len(leaderboard) == 0:
-        print("\n  No scores recorded yet. Be the first!")
-        return
+    print(render_leaderboard(board, 10, now))
 
-    # Sort leaderboard by XP (highest first) using a lambda function
-    sorted_board = sorted(leaderboard, key=lambda entry: entry["xp"], reverse=True)
 
-    print("\n" + "=" * 60)
-    print("  LEADERBOARD - Top Scores")
-    print("=" * 60)
-    print(f"  {'Rank':<6} {'Player':<20} {'Score':<10} {'XP':<10}")
-    print("  " + "-" * 50)
+def render_leaderboard(board, limit=10, now=None):
+    """
+    Build the text of a leaderboard screen, reusing the cached screen if the
+    board has not changed since it was last built.
+
+    Parameters:
+        board : A board from create_rank_board()
+        limit : How many top entries to show
+        now   : Current time, used to expire windowed boards
 
-    # Display top 10 entries using enumerate for ranking
-    for rank, entry in enumerate(sorted_board[:10], start=1):
-        medal = ""
-        if rank == 1:
-            medal = " << Champion"
-        elif rank == 2:
-            medal = " << Runner-up"
-        elif rank == 3:
-            medal = " << Third Place"
+    Returns:
+        The screen as a single string, ready to print.
+    """
+    # Expire old entries first - that changes the version if anything left
+    expire_rank_board(board, now)
+    key = ("leaderboard", board["version"], limit)
+    screen = _cached_screen(key)
+    if screen is not None:
+        return screen
+
+    top_entries = rank_board_top(board, limit, now)
+
+    if len(top_entries) == 0:
+        screen = "\n  No scores recorded yet. Be the first!"
+        _store_screen(key, screen)
+        return screen
+
+    lines = [
+        "\n" + "=" * 60,
+        f"  LEADERBOARD - {board['name']}",
+        "=" * 60,
+        f"  {'Rank':<6} {'Player':<20} {'Score':<10} {'XP':<10}",
+        "  " + "-" * 50
+    ]
+
+    # Reuse the formatted row for every rank still held by the same entry
+    previous_rows = board["rows"]
+    rows = {}
+    for rank, entry in enumerate(top_entries, start=1):
+        cached = previous_rows.get(rank)
+        if cached is not None and cached[0] is entry:
+            rows[rank] = cached
+        else:
+            medal = ""
+            if rank == 1:
+                medal = " << Champion"
+            elif rank == 2:
+                medal = " << Runner-up"
+            elif rank == 3:
+                medal = " << Third Place"
 
-        print(f"  {rank:<6} {entry['name']:<20} {entry['score']:<10} {entry['xp']:<10}{medal}")
+            name, score, xp = leaderboard_row_fields(entry)
+            rows[rank] = (entry, f"  {rank:<6} {name:<20} {score:<10} {xp:<10}{medal}")
+        lines.append(rows[rank][1])
+    board["rows"] = rows
 
-    print("=" * 60)
+    lines.append("=" * 60)
+    screen = "\n".join(lines)
+    _store_screen(key, screen)
+    return screen
 
 
 # ============================================================================
-# SECTION 5: INPUT FUNCTIONS
+# SECTION 3: INPUT FUNCTIONS
 # ============================================================================
 # These functions handle all user input with proper validation.
 # They use while loops to keep asking until valid input is received.
+# All input goes through read_input() and all timing through clock(), so the
+# trace recorder and replay harness (Section 15) can swap in recorded input
+# and a virtual clock.
 # ============================================================================
 
+IO_HOOKS = {
+    "input": None,   # Replacement for input(prompt), or None for the keyboard
+    "clock": None    # Replacement for time.time(), or None for the real clock
+}
+
+
+def read_input(prompt):
+    """Read a line of player input (from IO_HOOKS["input"] if one is set)."""
+    hook = IO_HOOKS["input"]
+    if hook is not None:
+        return hook(prompt)
+    return input(prompt)
+
+
+def clock():
+    """Return the current time in seconds (from IO_HOOKS["clock"] if one is set)."""
+    hook = IO_HOOKS["clock"]
+    if hook is not None:
+        return hook()
+    return time.time()
+
+
 def get_player_name():
     """
     Ask the player to enter their display name.
@@ -336,7 +220,7 @@ def get_player_name():
     Returns the cleaned name as a string.
     """
     while True:
-        name = input("\n  Enter your display name: ").strip()
+        name = read_input("\n  Enter your display name: ").strip()
 
         # Validate: name must not be empty
         if len(name) == 0:
@@ -360,7 +244,7 @@ def get_teaching_mode():
     display_teaching_modes()
 
     while True:
-        choice = input("\n  Choose your mode (1-5): ").strip()
+        choice = read_input("\n  Choose your mode (1-5): ").strip()
 
         # Validate: must be a digit
         if not choice.isdigit():
@@ -375,7 +259,7 @@ def get_teaching_mode():
             continue
 
         # Confirm selection
-        selected = TEACHING_MODES[mode_num]
+        selected = get_teaching_modes()[mode_num]
         print(f"\n  Selected: {selected['icon']} {selected['name']}")
         print(f"  {selected['description']}")
         return mode_num
@@ -387,23 +271,23 @@ def get_answer(mode_settings):
     Validates that the answer is one of A, B, C, or D.
     Returns the uppercase answer letter and the time taken in seconds.
     """
-    start_time = time.time()  # Record when the question was shown
+    start_time = clock()  # Record when the question was shown
 
     while True:
         # Show timer warning if in Pressure Mode
         if mode_settings["timed"]:
-            elapsed = time.time() - start_time
+            elapsed = clock() - start_time
             remaining = mode_settings["time_per_question"] - elapsed
 
             if remaining <= 0:
                 print("\n  TIME'S UP! No answer recorded.")
                 return "TIMEOUT", elapsed
 
-            answer = input(f"\n  Your answer (A/B/C/D) [{remaining:.0f}s remaining]: ").strip().upper()
+            answer = read_input(f"\n  Your answer (A/B/C/D) [{remaining:.0f}s remaining]: ").strip().upper()
         else:
-            answer = input("\n  Your answer (A/B/C/D): ").strip().upper()
+            answer = read_input("\n  Your answer (A/B/C/D): ").strip().upper()
 
-        end_time = time.time()
+        end_time = clock()
         time_taken = end_time - start_time
 
         # Check timeout after input in Pressure Mode
@@ -420,54 +304,38 @@ def get_answer(mode_settings):
 
 
 # ============================================================================
-# SECTION 6: QUIZ LOGIC FUNCTIONS
+# SECTION 4: QUIZ LOGIC FUNCTIONS
 # ============================================================================
 # Core game logic - asking questions, tracking scores, computing results.
 # ============================================================================
 
-def ask_question(question_dict, question_number, total_questions, mode_settings):
+def ask_question(view, question_number, total_questions, mode_view):
     """
     Display a single question and get the player's answer.
 
     Parameters:
-        question_dict   : Dictionary containing question data
+        view            : The question's QuestionView (see Section 18)
         question_number : Current question number (for display)
         total_questions : Total number of questions (for display)
-        mode_settings   : The active teaching mode's settings dictionary
+        mode_view       : The active teaching mode's ModeView
 
     Returns:
-        A dictionary with:
-            - "correct"     : True/False whether the answer was right
-            - "time_taken"  : Seconds taken to answer
-            - "question"    : The original question dictionary
-            - "user_answer" : What the player chose
+        A tuple (is_correct, answer, time_taken): whether the answer was
+        right, what the player chose ("TIMEOUT" if time ran out), and the
+        seconds taken to answer.
     """
     print(f"\n  Question {question_number} of {total_questions}")
-    print(f"  Topic: {question_dict['topic']} | Difficulty: {'Easy' if question_dict['difficulty'] == 1 else 'Medium' if question_dict['difficulty'] == 2 else 'Hard'}")
-    print_separator()
-    print(f"\n  {question_dict['q']}\n")
-
-    # Display all four options
-    for option in question_dict["options"]:
-        print(f"    {option}")
+    print(view.body)
 
     # Show hint in modes that support it (Recovery and Focus modes)
-    if mode_settings["show_hints"] and question_dict["difficulty"] >= 2:
-        correct_letter = question_dict["ans"]
-        # Find the correct option text
-        for opt in question_dict["options"]:
-            if opt.startswith(correct_letter + ")"):
-                hint_text = opt[3:].strip()  # Remove "X) " prefix
-                # Give a partial hint - first few characters
-                hint_preview = hint_text[:max(3, len(hint_text) // 3)]
-                print(f"\n  Hint: The answer starts with \"{hint_preview}...\"")
-                break
+    if mode_view.show_hints and view.hint_line is not None:
+        print(view.hint_line)
 
     # Get the player's answer
-    answer, time_taken = get_answer(mode_settings)
+    answer, time_taken = get_answer(mode_view.settings)
 
     # Check if the answer is correct
-    is_correct = (answer == question_dict["ans"])
+    is_correct = (answer == view.answer)
 
     # Display feedback based on the teaching mode
     if answer == "TIMEOUT":
@@ -475,30 +343,22 @@ def ask_question(question_dict, question_number, total_questions, mode_settings)
         is_correct = False
     elif is_correct:
         # Correct answer feedback
-        if mode_settings == TEACHING_MODES[5]:  # Recovery Mode - extra encouragement
+        if mode_view.feedback == FEEDBACK_ENCOURAGING:  # Recovery Mode - extra encouragement
             print("\n  CORRECT! Fantastic work! You're doing great, keep it up!")
         else:
             print("\n  CORRECT! Well done!")
     else:
         # Wrong answer feedback
-        print(f"\n  INCORRECT. The correct answer was: {question_dict['ans']}")
+        print(view.incorrect_line)
 
-        if mode_settings == TEACHING_MODES[5]:  # Recovery Mode - encouraging
+        if mode_view.feedback == FEEDBACK_ENCOURAGING:  # Recovery Mode - encouraging
             print("  Don't worry! Mistakes are how we learn. You'll get the next one!")
 
     # Show explanation based on mode settings
-    if mode_settings["show_explanation"]:
-        print(f"\n  Explanation: {question_dict['explanation']}")
-
-    # Build and return the result dictionary
-    result = {
-        "correct": is_correct,
-        "time_taken": time_taken,
-        "question": question_dict,
-        "user_answer": answer
-    }
+    if mode_view.show_explanation:
+        print(view.explanation_line)
 
-    return result
+    return is_correct, answer, time_taken
 
 
 def calculate_grade(percentage):
@@ -590,18 +450,19 @@ def award_badges(correct_count, total_questions, total_time, time_taken_list,
         A list of badge dictionaries (each with name, icon, desc).
     """
     earned = []
+    badges = get_badges()
 
     # First Steps - always awarded on first completion
-    earned.append(BADGES["first_steps"])
+    earned.append(badges["first_steps"])
 
     # Perfect Score - all questions correct
     if correct_count == total_questions:
-        earned.append(BADGES["perfect_score"])
-        earned.append(BADGES["no_mistakes"])
+        earned.append(badges["perfect_score"])
+        earned.append(badges["no_mistakes"])
 
     # Quick Thinker - finished in under 2 minutes
     if total_time < 120:
-        earned.append(BADGES["quick_thinker"])
+        earned.append(badges["quick_thinker"])
 
     # Speed Demon - 5+ answers in under 5 seconds each
     fast_answers = 0
@@ -609,155 +470,386 @@ def award_badges(correct_count, total_questions, total_time, time_taken_list,
         if t < 5.0:
             fast_answers += 1
     if fast_answers >= 5:
-        earned.append(BADGES["speed_demon"])
+        earned.append(badges["speed_demon"])
 
     # Halfway Hero - at least 50% correct
     if correct_count >= total_questions / 2:
-        earned.append(BADGES["halfway_hero"])
+        earned.append(badges["halfway_hero"])
 
     # Streak Master - 5+ correct in a row
     if streak_max >= 5:
-        earned.append(BADGES["streak_master"])
+        earned.append(badges["streak_master"])
 
     # Persistent - played more than once
     if play_count > 1:
-        earned.append(BADGES["persistent"])
+        earned.append(badges["persistent"])
 
     # Topic Expert - got all questions right in at least one topic
     for topic, scores in topic_scores.items():
         if scores[0] == scores[1] and scores[1] > 0:  # All correct in this topic
-            earned.append(BADGES["topic_expert"])
+            earned.append(badges["topic_expert"])
             break  # Only award once even if expert in multiple topics
 
     return earned
 
 
 # ============================================================================
-# SECTION 7: RESULTS DISPLAY
+# SECTION 5: SESSION RECORDS
+# ============================================================================
+# A finished quiz session is kept as a compact SessionRecord instead of a list
+# of dictionaries. Per-answer data is stored in flat arrays:
+#   - question_ids : array of question bank positions (not question objects)
+#   - answers      : one byte per answer - "A" to "D", or "-" for a timeout
+#   - times        : array('f') of seconds taken per answer
+#   - correct_bits : one bit per answer, set when the answer was right
+#   - badges       : one bit per badge earned, in the order of BADGE_KEYS
+# A 10-question session takes a few hundred bytes, so millions of historical
+# sessions fit in memory, and pack_session_record() turns a record into
+# bytes for storage.
+# ============================================================================
+
+SessionRecord = namedtuple("SessionRecord", [
+    "player", "mode_num", "question_ids", "answers", "times", "correct_bits",
+    "total_time", "xp", "badges", "finished_at"
+])
+
+SESSION_RECORD_VERSION = 3
+_RECORD_HEADER = struct.Struct("<BBHHIIddi")   # Fixed-size part of a packed record
+TIMEOUT_BYTE = ord("-")
+
+# Badge keys in the order award_badges() checks them, so a decoded record
+# lists its badges exactly as they were awarded. Bit i stands for BADGE_KEYS[i].
+BADGE_KEYS = ["first_steps", "perfect_score", "no_mistakes", "quick_thinker",
+              "speed_demon", "halfway_hero", "streak_master", "persistent",
+              "topic_expert", "curious_mind"]
+
+
+def create_session_record(player_name, mode_num, question_ids):
+    """Create an empty record for a session that will ask these questions."""
+    return SessionRecord(
+        player=player_name,
+        mode_num=mode_num,
+        question_ids=array("I", question_ids),
+        answers=bytearray(),
+        times=array("f"),
+        correct_bits=bytearray((len(question_ids) + 7) // 8),
+        total_time=0.0,
+        xp=0,
+        badges=0,
+        finished_at=0.0
+    )
+
+
+def record_answer(record, position, answer, time_taken, is_correct):
+    """Store the answer to the question at `position` (0-based) in a record."""
+    if answer == "TIMEOUT":
+        record.answers.append(TIMEOUT_BYTE)
+    else:
+        record.answers.append(ord(answer))
+    record.times.append(time_taken)
+    if is_correct:
+        record.correct_bits[position // 8] |= 1 << (position % 8)
+
+
+def finish_session_record(record, total_time, xp, badges, finished_at):
+    """
+    Return the record with its final totals filled in.
+    badges is a bitmask from badge_mask().
+    """
+    return record._replace(total_time=total_time, xp=xp, badges=badges,
+                           finished_at=finished_at)
+
+
+def badge_mask(badges_earned):
+    """Turn a list of badge dictionaries into a bitmask (bit i = BADGE_KEYS[i])."""
+    badges = get_badges()
+    mask = 0
+    for bit, key in enumerate(BADGE_KEYS):
+        if badges[key] in badges_earned:
+            mask |= 1 << bit
+    return mask
+
+
+def record_badges(record):
+    """Return the badge dictionaries earned in a record, in the order they were awarded."""
+    badges = get_badges()
+    earned = []
+    for bit, key in enumerate(BADGE_KEYS):
+        if record.badges & (1 << bit):
+            earned.append(badges[key])
+    return earned
+
+
+def record_is_correct(record, position):
+    """Return True if the answer at `position` was correct."""
+    return bool(record.correct_bits[position // 8] & (1 << (position % 8)))
+
+
+def record_correct_count(record):
+    """Count the correct answers in a record."""
+    return bin(int.from_bytes(record.correct_bits, "little")).count("1")
+
+
+def record_answer_text(record, position):
+    """Return the player's answer at `position` as text ("TIMEOUT" for a timeout)."""
+    if record.answers[position] == TIMEOUT_BYTE:
+        return "TIMEOUT"
+    return chr(record.answers[position])
+
+
+def record_score_text(record):
+    """Return the score as shown on screen, e.g. "7/10"."""
+    return f"{record_correct_count(record)}/{len(record.question_ids)}"
+
+
+def pack_session_record(record):
+    """Pack a record into bytes (the inverse of unpack_session_record)."""
+    player_bytes = record.player.encode("utf-8")
+    header = _RECORD_HEADER.pack(SESSION_RECORD_VERSION, record.mode_num,
+                                 record.badges, len(player_bytes),
+                                 len(record.question_ids), len(record.answers),
+                                 record.total_time, record.finished_at, record.xp)
+    return b"".join([header, player_bytes, record.question_ids.tobytes(),
+                     bytes(record.answers), record.times.tobytes(),
+                     bytes(record.correct_bits)])
+
+
+def unpack_session_record(data):
+    """Rebuild a SessionRecord from bytes made by pack_session_record()."""
+    (version, mode_num, badges, name_length, count, answered, total_time,
+     finished_at, xp) = _RECORD_HEADER.unpack_from(data, 0)
+    if version != SESSION_RECORD_VERSION:
+        raise ValueError(f"Unsupported session record version {version}")
+
+    offset = _RECORD_HEADER.size
+    player = data[offset:offset + name_length].decode("utf-8")
+    offset += name_length
+
+    question_ids = array("I")
+    question_ids.frombytes(data[offset:offset + count * question_ids.itemsize])
+    offset += count * question_ids.itemsize
+
+    # A session that was not finished has fewer answers than questions
+    answers = bytearray(data[offset:offset + answered])
+    offset += answered
+
+    times = array("f")
+    times.frombytes(data[offset:offset + answered * times.itemsize])
+    offset += answered * times.itemsize
+
+    correct_bits = bytearray(data[offset:offset + (count + 7) // 8])
+
+    return SessionRecord(player, mode_num, question_ids, answers, times,
+                         correct_bits, total_time, xp, badges, finished_at)
+
+
+# ============================================================================
+# SECTION 6: RESULTS DISPLAY
 # ============================================================================
 # Functions for showing the final quiz results, XP breakdown, and badges.
 # ============================================================================
 
-def display_results(player_name, results_list, xp_info, badges_earned, grade,
-                    percentage, mode_name, total_time):
+def ordinal(number):
+    """Return a whole number with its English ordinal suffix: 1st, 22nd, 33rd, 11th."""
+    if number % 100 in (11, 12, 13):
+        suffix = "th"
+    else:
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
+def display_results(record, xp_info, grade, percentage, rank_info=None,
+                    review_topics=None):
     """
     Display the complete quiz results summary.
     Shows score, grade, XP breakdown, earned badges, and wrong answers review.
 
     Parameters:
-        player_name   : The player's display name
-        results_list  : List of result dictionaries from each question
+        record        : The finished SessionRecord (see Section 5), which
+                        also holds the badges earned
         xp_info       : XP calculation dictionary from calculate_xp()
-        badges_earned : List of badge dictionaries from award_badges()
         grade         : Letter grade string
         percentage    : Score percentage float
-        mode_name     : Name of the teaching mode used
-        total_time    : Total time taken in seconds
+        rank_info     : Optional (rank, percentile, sessions) from rank_board_rank()
+        review_topics : Optional [(topic, mastery)] from weakest_topics()
     """
-    correct_count = 0
-    for r in results_list:
-        if r["correct"]:
-            correct_count += 1
-    total_questions = len(results_list)
+    print(render_results(record, xp_info, grade, percentage, rank_info,
+                         review_topics))
 
-    print("\n" + "=" * 60)
-    print("  QUIZ COMPLETE - RESULTS")
-    print("=" * 60)
+
+def render_results(record, xp_info, grade, percentage, rank_info=None,
+                   review_topics=None):
+    """
+    Build the text of the results screen (same parameters as display_results).
+    Each session's results are shown once, so they are not kept in the
+    screen cache - that is left to the leaderboards, which are redrawn often.
+
+    Returns:
+        The screen as a single string, ready to print.
+    """
+    correct_count = record_correct_count(record)
+    total_questions = len(record.question_ids)
+    mode_name = get_teaching_modes()[record.mode_num]["name"]
+    total_time = record.total_time
+    player_name = record.player
+
+    lines = [
+        "\n" + "=" * 60,
+        "  QUIZ COMPLETE - RESULTS",
+        "=" * 60
+    ]
 
     # Player summary
-    print(f"\n  Player:         {player_name}")
-    print(f"  Teaching Mode:  {mode_name}")
-    print(f"  Time Taken:     {total_time:.1f} seconds")
-    print(f"\n  Score:          {correct_count} / {total_questions}")
-    print(f"  Percentage:     {percentage:.1f}%")
-    print(f"  Grade:          {grade}")
+    lines.append(f"\n  Player:         {player_name}")
+    lines.append(f"  Teaching Mode:  {mode_name}")
+    lines.append(f"  Time Taken:     {total_time:.1f} seconds")
+    lines.append(f"\n  Score:          {correct_count} / {total_questions}")
+    lines.append(f"  Percentage:     {percentage:.1f}%")
+    lines.append(f"  Grade:          {grade}")
 
     # XP Breakdown
-    print("\n  " + "-" * 40)
-    print("  XP BREAKDOWN")
-    print("  " + "-" * 40)
-    print(f"  Base XP:        {xp_info['base_xp']} ({correct_count} x 10)")
-    print(f"  Speed Bonus:    +{xp_info['speed_bonus']}")
-    print(f"  Streak Bonus:   +{xp_info['streak_bonus']}")
-    print(f"  Mode Multiplier: x{xp_info['multiplier']}")
-    print(f"  -------------------------")
-    print(f"  TOTAL XP:       {xp_info['total_xp']} XP")
+    lines.append("\n  " + "-" * 40)
+    lines.append("  XP BREAKDOWN")
+    lines.append("  " + "-" * 40)
+    lines.append(f"  Base XP:        {xp_info['base_xp']} ({correct_count} x 10)")
+    lines.append(f"  Speed Bonus:    +{xp_info['speed_bonus']}")
+    lines.append(f"  Streak Bonus:   +{xp_info['streak_bonus']}")
+    lines.append(f"  Mode Multiplier: x{xp_info['multiplier']}")
+    lines.append(f"  -------------------------")
+    lines.append(f"  TOTAL XP:       {xp_info['total_xp']} XP")
 
     # Badges
-    print("\n  " + "-" * 40)
-    print("  BADGES EARNED")
-    print("  " + "-" * 40)
+    badges_earned = record_badges(record)
+    lines.append("\n  " + "-" * 40)
+    lines.append("  BADGES EARNED")
+    lines.append("  " + "-" * 40)
 
     if len(badges_earned) == 0:
-        print("  No badges earned this round. Keep trying!")
+        lines.append("  No badges earned this round. Keep trying!")
     else:
         for badge in badges_earned:
-            print(f"  {badge['icon']} {badge['name']} - {badge['desc']}")
+            lines.append(f"  {badge['icon']} {badge['name']} - {badge['desc']}")
 
     # Wrong answers review
-    wrong_answers = []
-    for r in results_list:
-        if not r["correct"]:
-            wrong_answers.append(r)
-
-    if len(wrong_answers) > 0:
-        print("\n  " + "-" * 40)
-        print("  REVIEW - Questions You Missed")
-        print("  " + "-" * 40)
-
-        for i, wrong in enumerate(wrong_answers, start=1):
-            q = wrong["question"]
-            print(f"\n  {i}. {q['q']}")
-            print(f"     Your answer: {wrong['user_answer']}")
-            print(f"     Correct answer: {q['ans']}")
-            print(f"     {q['explanation']}")
-
-    print("\n" + "=" * 60)
+    wrong_positions = []
+    for position in range(total_questions):
+        if not record_is_correct(record, position):
+            wrong_positions.append(position)
+
+    if len(wrong_positions) > 0:
+        lines.append("\n  " + "-" * 40)
+        lines.append("  REVIEW - Questions You Missed")
+        lines.append("  " + "-" * 40)
+
+        question_bank = get_question_bank()
+        for i, position in enumerate(wrong_positions, start=1):
+            q = question_bank[record.question_ids[position]]
+            lines.append(f"\n  {i}. {q['q']}")
+            lines.append(f"     Your answer: {record_answer_text(record, position)}")
+            lines.append(f"     Correct answer: {q['ans']}")
+            lines.append(f"     {q['explanation']}")
+
+    # Overall ranking among everyone on the all-time leaderboard
+    if rank_info is not None:
+        rank, percentile, sessions = rank_info
+        lines.append("\n  " + "-" * 40)
+        lines.append(f"  RANK: #{rank} of {sessions} quiz sessions "
+                     f"({ordinal(round(percentile))} percentile)")
+
+    # Topics with the lowest estimated mastery so far
+    if review_topics is not None:
+        lines.append("\n  " + "-" * 40)
+        lines.append("  TOPICS TO REVIEW")
+        lines.append("  " + "-" * 40)
+        if len(review_topics) == 0:
+            lines.append("  Every topic you have played is mastered. Great work!")
+        for topic, probability in review_topics:
+            lines.append(f"  {topic:<20} {probability * 100:.0f}% mastered")
+
+    lines.append("\n" + "=" * 60)
+    return "\n".join(lines)
 
 
 # ============================================================================
-# SECTION 8: MAIN QUIZ FUNCTION
+# SECTION 7: MAIN QUIZ FUNCTION
 # ============================================================================
 # The run_quiz function orchestrates the entire quiz session - selecting
 # questions, running the game loop, tracking statistics, and computing results.
 # ============================================================================
 
-def run_quiz(player_name, mode_num, num_questions=10, play_count=1):
+def run_quiz(player_name, mode_num, num_questions=10, play_count=1,
+             checkpoint_path=None, resume=None, question_ids=None,
+             leaderboards=None, mastery=None):
     """
     Run a complete quiz session from start to finish.
 
     Parameters:
-        player_name   : The player's display name (string)
-        mode_num      : Selected teaching mode 1-5 (integer)
-        num_questions  : How many questions to ask (integer, default 10)
-        play_count    : How many times this player has played (integer)
+        player_name     : The player's display name (string)
+        mode_num        : Selected teaching mode 1-5 (integer)
+        num_questions   : How many questions to ask (integer, default 10)
+        play_count      : How many times this player has played (integer)
+        checkpoint_path : File to checkpoint progress to, or None to disable
+        resume          : A checkpoint from load_checkpoint() to continue from
+        question_ids    : Fixed question order (e.g. from student_form()),
+                          or None to pick random questions
+        leaderboards    : Boards from create_leaderboards() to record the
+                          session on, or None to skip ranking
+        mastery         : Model from create_mastery_model() to update with
+                          the answers, or None to skip topic mastery
 
     Returns:
-        A dictionary with the session results including score, xp, grade, etc.
+        The finished SessionRecord (see Section 5), including the XP earned.
     """
-    mode_settings = TEACHING_MODES[mode_num]
-
-    print(f"\n  Starting quiz in {mode_settings['icon']} {mode_settings['name']}...")
-    print(f"  {num_questions} questions. Let's go!\n")
+    mode_settings = get_teaching_modes()[mode_num]
+
+    if resume is not None:
+        # Continue the interrupted session with its original question order
+        question_ids = resume["question_ids"]
+        saved_answers = resume["answers"]
+        print(f"\n  Resuming quiz in {mode_settings['icon']} {mode_settings['name']}...")
+        print(f"  {len(saved_answers)} of {len(question_ids)} questions already answered.\n")
+    else:
+        if question_ids is None:
+            # Prepare questions: shuffle question ids for randomized order
+            question_ids = list(range(len(get_question_bank())))
+            random.shuffle(question_ids)
+
+            # Limit to requested number of questions
+            if num_questions < len(question_ids):
+                question_ids = question_ids[:num_questions]
+
+        saved_answers = []
+        print(f"\n  Starting quiz in {mode_settings['icon']} {mode_settings['name']}...")
+        print(f"  {len(question_ids)} questions. Let's go!\n")
     print_separator("=")
 
-    # Prepare questions: shuffle for randomized order
-    questions = QUESTION_BANK.copy()  # Copy so we don't modify the original
-    random.shuffle(questions)
+    question_bank = get_question_bank()
+    questions = [question_bank[qid] for qid in question_ids]
+
+    # Ready-made question and mode text (Section 18)
+    all_views = get_question_views()
+    question_views = [all_views[qid] for qid in question_ids]
+    mode_view = get_mode_views()[mode_num]
 
-    # Limit to requested number of questions
-    if num_questions < len(questions):
-        questions = questions[:num_questions]
+    # Open the checkpoint log (a fresh session writes its header record first)
+    checkpoint_file = None
+    if checkpoint_path is not None:
+        if resume is not None:
+            checkpoint_file = reopen_checkpoint(checkpoint_path, resume)
+        else:
+            checkpoint_file = start_checkpoint(checkpoint_path, player_name, mode_num,
+                                               play_count, question_ids)
 
     # Initialize tracking variables
-    results_list = []        # List to store each question's result
-    time_taken_list = []     # List to store time taken per question
+    record = create_session_record(player_name, mode_num, question_ids)
+    correct_count = 0        # Correct answers so far
     current_streak = 0       # Current consecutive correct answers
     max_streak = 0           # Longest streak achieved
     topic_scores = {}        # Dictionary to track scores per topic
 
-    # Record quiz start time
-    quiz_start_time = time.time()
+    # Record quiz start time (shifted back by any time already spent)
+    elapsed_before = saved_answers[-1][2] if len(saved_answers) > 0 else 0.0
+    quiz_start_time = clock() - elapsed_before
 
     # ---- MAIN QUIZ LOOP ----
     # Iterate through each question using enumerate for the question number
@@ -768,42 +860,54 @@ def run_quiz(player_name, mode_num, num_questions=10, play_count=1):
         if topic not in topic_scores:
             topic_scores[topic] = [0, 0]  # [correct, total]
 
-        # Ask the question and get the result
-        result = ask_question(question, i, len(questions), mode_settings)
-        results_list.append(result)
-        time_taken_list.append(result["time_taken"])
+        if i <= len(saved_answers):
+            # Already answered before the interruption - replay the saved answer
+            answer, time_taken, elapsed = saved_answers[i - 1]
+            is_correct = (answer == question["ans"])
+        else:
+            # Ask the question and get the result
+            is_correct, answer, time_taken = ask_question(question_views[i - 1], i,
+                                                          len(questions), mode_view)
+
+            # Checkpoint just this answer before moving on
+            if checkpoint_file is not None:
+                append_checkpoint(checkpoint_file, answer, time_taken,
+                                  clock() - quiz_start_time)
+
+        record_answer(record, i - 1, answer, time_taken, is_correct)
 
         # Update topic scores
         topic_scores[topic][1] += 1  # Increment total for this topic
-        if result["correct"]:
+        if is_correct:
             topic_scores[topic][0] += 1  # Increment correct for this topic
+            correct_count += 1
 
         # Update streak tracking
-        if result["correct"]:
+        if is_correct:
             current_streak += 1
             if current_streak > max_streak:
                 max_streak = current_streak
         else:
             current_streak = 0  # Reset streak on wrong answer
 
+        # Replayed answers were already shown before the interruption
+        if i <= len(saved_answers):
+            continue
+
         # Show running score
-        correct_so_far = 0
-        for r in results_list:
-            if r["correct"]:
-                correct_so_far += 1
-        print(f"\n  Running Score: {correct_so_far}/{i} | Streak: {current_streak}")
+        print(f"\n  Running Score: {correct_count}/{i} | Streak: {current_streak}")
         print_separator()
 
     # Record quiz end time and calculate duration
-    quiz_end_time = time.time()
+    quiz_end_time = clock()
     total_time = quiz_end_time - quiz_start_time
 
-    # ---- CALCULATE FINAL RESULTS ----
-    correct_count = 0
-    for r in results_list:
-        if r["correct"]:
-            correct_count += 1
+    # The session is complete, so its checkpoint is no longer needed
+    if checkpoint_file is not None:
+        checkpoint_file.close()
+        clear_checkpoint(checkpoint_path)
 
+    # ---- CALCULATE FINAL RESULTS ----
     total_questions = len(questions)
 
     # Calculate percentage (handle division by zero)
@@ -816,143 +920,2366 @@ def run_quiz(player_name, mode_num, num_questions=10, play_count=1):
     grade = calculate_grade(percentage)
 
     # Calculate XP
-    xp_info = calculate_xp(correct_count, time_taken_list, mode_settings, max_streak)
+    xp_info = calculate_xp(correct_count, record.times, mode_settings, max_streak)
 
     # Award badges
     badges_earned = award_badges(
-        correct_count, total_questions, total_time, time_taken_list,
+        correct_count, total_questions, total_time, record.times,
         max_streak, mode_num, play_count, topic_scores
     )
 
+    # Complete the record - this is what the leaderboard keeps
+    record = finish_session_record(record, total_time, xp_info["total_xp"],
+                                   badge_mask(badges_earned), quiz_end_time)
+
+    # Record the session and look up the player's overall rank
+    rank_info = None
+    if leaderboards is not None:
+        record_leaderboard_entry(leaderboards, record, quiz_end_time)
+        rank_info = rank_board_rank(leaderboards["all_time"], record.xp, quiz_end_time)
+
+    # Update topic mastery and find the topics worth reviewing (Section 17)
+    review_topics = None
+    if mastery is not None:
+        update_mastery(mastery, record_observations(record))
+        review_topics = weakest_topics(mastery, player_name)
+
     # Display results
-    display_results(
-        player_name, results_list, xp_info, badges_earned,
-        grade, percentage, mode_settings["name"], total_time
-    )
+    display_results(record, xp_info, grade, percentage, rank_info,
+                    review_topics)
 
-    # Return session data for leaderboard
-    return {
-        "name": player_name,
-        "score": f"{correct_count}/{total_questions}",
-        "percentage": percentage,
-        "grade": grade,
-        "xp": xp_info["total_xp"],
-        "badges": len(badges_earned),
-        "mode": mode_settings["name"],
-        "time": total_time
-    }
+    return record
 
 
 # ============================================================================
-# SECTION 9: MAIN MENU & GAME LOOP
+# SECTION 8: SESSION CHECKPOINTS
 # ============================================================================
-# The main() function is the entry point. It shows the main menu, handles
-# navigation between quiz, leaderboard, and settings, and manages the
-# overall game loop using a while loop.
+# If the program stops halfway through a quiz, the session should not be lost.
+# Each session keeps a small log file: one header record with the question
+# order, then one compact record appended per answer. Appending a single line
+# costs the same no matter how long the session is. On restart the log is
+# replayed and the quiz continues at the next unanswered question.
 # ============================================================================
 
-def main():
+CHECKPOINT_DIR = "learnova_checkpoints"   # Set to None to disable checkpoints
+CHECKPOINT_VERSION = 1                    # Bump if the record layout changes
+
+
+def checkpoint_path_for(player_name):
     """
-    Main entry point for the Learnova Quiz Engine.
-    Displays the main menu and handles the game loop.
-    Uses a while loop that continues until the player chooses to exit.
+    Build the checkpoint file path for a player.
+    Unsafe filename characters are replaced, and a checksum of the real name
+    keeps names like "a b" and "a_b" from sharing a file.
     """
-    # Display welcome banner
-    print_banner()
+    safe_name = ""
+    for char in player_name:
+        safe_name += char if char.isalnum() else "_"
+    checksum = zlib.crc32(player_name.encode("utf-8"))
+    return os.path.join(CHECKPOINT_DIR, f"{safe_name}-{checksum:08x}.jsonl")
 
-    # Get player name
-    player_name = get_player_name()
-    print(f"\n  Welcome, {player_name}! Ready to learn?")
 
-    # Initialize persistent data
-    leaderboard = []   # List of all session results (persists across rounds)
-    play_count = 0     # Track how many times the player has played
+def start_checkpoint(path, player_name, mode_num, play_count, question_ids):
+    """
+    Create a new checkpoint log for a session and write its header record.
+    Returns the open file, which append_checkpoint() writes answers to.
+    """
+    directory = os.path.dirname(path)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+
+    header = {
+        "v": CHECKPOINT_VERSION,
+        "player": player_name,
+        "mode": mode_num,
+        "play": play_count,
+        "ids": question_ids
+    }
+    checkpoint_file = open(path, "w", encoding="utf-8")
+    checkpoint_file.write(json.dumps(header, separators=(",", ":")) + "\n")
+    checkpoint_file.flush()
+    os.fsync(checkpoint_file.fileno())
+    return checkpoint_file
 
-    # ---- MAIN MENU LOOP ----
-    running = True
-    while running:
-        print("\n" + "=" * 60)
-        print("  MAIN MENU")
-        print("=" * 60)
-        print("\n  1. Start New Quiz")
-        print("  2. View Leaderboard")
-        print("  3. About Learnova")
-        print("  4. Exit")
-        print_separator()
 
-        choice = input("\n  Select option (1-4): ").strip()
+def append_checkpoint(checkpoint_file, answer, time_taken, elapsed):
+    """
+    Append one answer to the checkpoint log as a compact record:
+    [answer, seconds taken, seconds elapsed since the quiz started].
+    Only this delta is written - earlier records are never rewritten.
+    """
+    record = [answer, round(time_taken, 3), round(elapsed, 3)]
+    checkpoint_file.write(json.dumps(record, separators=(",", ":")) + "\n")
+    checkpoint_file.flush()
+    os.fsync(checkpoint_file.fileno())  # Make sure it survives a crash
 
-        if choice == "1":
-            # Start a new quiz
-            mode_num = get_teaching_mode()
-            play_count += 1
 
-            # Ask how many questions
-            print(f"\n  Available questions: {len(QUESTION_BANK)}")
-            q_count_input = input(f"  How many questions? (1-{len(QUESTION_BANK)}, Enter for 10): ").strip()
+def load_checkpoint(path):
+    """
+    Read a session back from its checkpoint log.
+    A half-written last line (from a crash mid-write) is ignored. A log with
+    every answer in it is still returned: the program stopped before the
+    session was scored, and resuming it just shows the results.
 
-            if q_count_input == "":
-                num_questions = 10
-            elif q_count_input.isdigit() and 1 <= int(q_count_input) <= len(QUESTION_BANK):
-                num_questions = int(q_count_input)
-            else:
-                print("  Invalid number. Using 10 questions.")
-                num_questions = 10
+    Returns:
+        None if there is no usable checkpoint, otherwise a dictionary with
+        player, mode_num, play_count, question_ids and answers, where answers
+        is a list of [answer, time_taken, elapsed] records, and valid_size,
+        the length in bytes of the log up to the end of the last valid record.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as checkpoint_file:
+        lines = checkpoint_file.read().split(b"\n")
+
+    # Only lines ending in a newline were written completely - the piece
+    # after the last newline is either empty or a torn write
+    complete_lines = lines[:-1]
+    if len(complete_lines) == 0:
+        return None
+
+    try:
+        header = json.loads(complete_lines[0])
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or header.get("v") != CHECKPOINT_VERSION:
+        return None
+    valid_size = len(complete_lines[0]) + 1
+
+    answers = []
+    for line in complete_lines[1:len(header["ids"]) + 1]:
+        try:
+            answers.append(json.loads(line))
+        except ValueError:
+            break  # Damaged record - everything before it is still valid
+        valid_size += len(line) + 1
 
-            # Run the quiz and get results
-            session_result = run_quiz(player_name, mode_num, num_questions, play_count)
+    return {
+        "player": header["player"],
+        "mode_num": header["mode"],
+        "play_count": header["play"],
+        "question_ids": header["ids"],
+        "answers": answers,
+        "valid_size": valid_size
+    }
 
-            # Add to leaderboard
-            leaderboard.append(session_result)
 
-        elif choice == "2":
-            # View leaderboard
-            display_leaderboard(leaderboard)
+def reopen_checkpoint(path, saved):
+    """
+    Reopen a checkpoint log to append more answers after load_checkpoint().
+    Anything after the last valid record (such as a torn write) is cut off
+    first, so the next answer starts on a line of its own.
+    """
+    os.truncate(path, saved["valid_size"])
+    return open(path, "a", encoding="utf-8")
 
-        elif choice == "3":
-            # About section
-            print("\n" + "=" * 60)
-            print("  ABOUT LEARNOVA")
-            print("=" * 60)
-            print("""
-  Learnova is an AI-powered education platform that transforms
-  any lecture material into gamified, engaging lesson plans in
-  seconds.
 
-  The full platform (built with React, Node.js, and TypeScript)
-  allows teachers to:
-    - Upload any lecture material (PDF, PPTX, DOCX, text)
-    - Select a Teaching Mode for their classroom dynamic
-    - Get AI-generated gamified lesson plans in under 60 seconds
-    - Run live quizzes where students join from their phones
-    - Track progress with XP, badges, and leaderboards
+def clear_checkpoint(path):
+    """Delete a session's checkpoint log once it is finished or abandoned."""
+    if os.path.exists(path):
+        os.remove(path)
 
-  This Python version demonstrates the core quiz engine and
-  gamification system that powers the full Learnova platform.
 
-  Built by: Ghaleb, Hala, Feyza
-  Course: Programming Fundamentals | February 2026
-            """)
-            print("=" * 60)
+# ============================================================================
+# SECTION 9: CLASSROOM QUIZ FORMS
+# ============================================================================
+# A quiz form is a fixed, reproducible selection of question ids built from a
+# seed. Forms are balanced: questions are dealt round-robin across topics, and
+# within each topic across difficulty levels. Forms are cached by
+# (seed, filters, length), so a whole classroom shares one form and each
+# student only gets their own shuffled copy of it - O(k) work per join.
+# ============================================================================
 
-        elif choice == "4":
-            # Exit
-            print(f"\n  Thanks for playing, {player_name}!")
-            print("  Keep learning, keep growing.")
-            print("  Powered by Learnova\n")
-            running = False
+QUIZ_FORM_CACHE = {}   # (seed, topics, difficulties, length) -> tuple of ids
 
-        else:
-            print("  Invalid option. Please enter 1, 2, 3, or 4.")
+
+def build_quiz_form(seed, length, topics=None, difficulties=None):
+    """
+    Build (or fetch from the cache) a balanced quiz form.
+
+    Parameters:
+        seed         : Integer seed - the same seed always gives the same form
+        length       : Number of questions on the form
+        topics       : Optional list of topics to draw from (None = all)
+        difficulties : Optional list of difficulty levels (None = all)
+
+    Returns:
+        A tuple of question ids (indexes into QUESTION_BANK).
+    """
+    topic_key = tuple(sorted(topics)) if topics else None
+    difficulty_key = tuple(sorted(difficulties)) if difficulties else None
+    cache_key = (seed, topic_key, difficulty_key, length)
+
+    if cache_key in QUIZ_FORM_CACHE:
+        return QUIZ_FORM_CACHE[cache_key]
+
+    rng = random.Random(seed)
+
+    # Group matching questions: topic -> difficulty -> list of question ids
+    groups = {}
+    for qid, question in enumerate(get_question_bank()):
+        if topic_key is not None and question["topic"] not in topic_key:
+            continue
+        if difficulty_key is not None and question["difficulty"] not in difficulty_key:
+            continue
+        by_difficulty = groups.setdefault(question["topic"], {})
+        by_difficulty.setdefault(question["difficulty"], []).append(qid)
+
+    # Shuffle every group, and the order groups are dealt from, using the seed
+    topic_order = sorted(groups)
+    rng.shuffle(topic_order)
+    difficulty_orders = {}
+    for topic in topic_order:
+        difficulty_orders[topic] = sorted(groups[topic])
+        rng.shuffle(difficulty_orders[topic])
+        for level in difficulty_orders[topic]:
+            rng.shuffle(groups[topic][level])
+
+    # Deal round-robin: one question per topic per round, and inside a topic
+    # rotate through its difficulty levels on each turn
+    form = []
+    turns = {topic: 0 for topic in topic_order}
+    while len(form) < length and len(topic_order) > 0:
+        for topic in list(topic_order):
+            if len(form) >= length:
+                break
+
+            levels = difficulty_orders[topic]
+            level = levels[turns[topic] % len(levels)]
+            turns[topic] += 1
+            form.append(groups[topic][level].pop())
+
+            # Drop emptied difficulty levels, and topics with nothing left
+            if len(groups[topic][level]) == 0:
+                levels.remove(level)
+            if len(levels) == 0:
+                topic_order.remove(topic)
+
+    form = tuple(form)
+    QUIZ_FORM_CACHE[cache_key] = form
+    return form
+
+
+def build_form_variants(seed, count, length, topics=None, difficulties=None):
+    """
+    Build a few balanced variants of a form (consecutive seeds), for classes
+    that should not all see exactly the same questions.
+    Returns a list of forms.
+    """
+    variants = []
+    for variant in range(count):
+        variants.append(build_quiz_form(seed + variant, length, topics, difficulties))
+    return variants
+
+
+def student_form(forms, player_name, seed):
+    """
+    Give a student their own question order.
+    The student is assigned to one of the forms (a single form may also be
+    passed) and gets a permutation of it that depends only on the seed and
+    their name, so re-joining reproduces the same quiz.
+
+    Returns:
+        A list of question ids, ready for run_quiz(question_ids=...).
+    """
+    if isinstance(forms, tuple):
+        forms = [forms]
+
+    student_hash = zlib.crc32(player_name.encode("utf-8"))
+    form = forms[student_hash % len(forms)]
+
+    question_ids = list(form)
+    random.Random(seed * 1000003 + student_hash).shuffle(question_ids)
+    return question_ids
 
 
 # ============================================================================
-# SECTION 10: PROGRAM ENTRY POINT
+# SECTION 10: RANKED LEADERBOARDS
 # ============================================================================
-# This is the standard Python entry point. The if __name__ == "__main__"
-# check ensures main() only runs when this file is executed directly,
-# not when it is imported as a module.
+# A rank board counts how many sessions scored each XP value, stored in a
+# Fenwick tree (binary indexed tree). That answers "how many scored at most X"
+# in O(log n), so a player's rank and percentile stay cheap with millions of
+# entries, and the top 10 can be read without sorting anything.
+# Boards with a time window (daily, weekly) drop entries automatically once
+# they are older than the window.
 # ============================================================================
 
-if __name__ == "__main__":
-    main()
+SECONDS_PER_DAY = 24 * 60 * 60
+BOARD_VERSION_STAMPS = itertools.count(1)   # Never repeats, even across boards
+LEADERBOARD_WINDOWS = {
+    "daily": ("Today", SECONDS_PER_DAY),
+    "weekly": ("This Week", 7 * SECONDS_PER_DAY),
+}
+
+
+def create_rank_board(name, window_seconds=None, max_xp=1024):
+    """
+    Create an empty rank board.
+
+    Parameters:
+        name           : Title shown above the board
+        window_seconds : Entries older than this are dropped (None = keep all)
+        max_xp         : Initial XP range; the board grows if scores exceed it
+
+    Returns:
+        A dictionary holding the Fenwick tree, the entries grouped by XP,
+        (for windowed boards) a queue of entries in the order they arrived,
+        and a version stamp that changes whenever the entries change.
+    """
+    return {
+        "name": name,
+        "window": window_seconds,
+        "size": max_xp,
+        "tree": [0] * (max_xp + 1),   # Fenwick tree, 1-based: position = xp + 1
+        "buckets": {},                # xp -> deque of entries with that XP
+        "queue": deque(),             # (timestamp, xp) for windowed boards
+        "count": 0,
+        "version": next(BOARD_VERSION_STAMPS),   # Screen cache key (Section 2)
+        "rows": {}                    # rank -> (entry, formatted row) last shown
+    }
+
+
+def _fenwick_add(tree, position, delta):
+    """Add delta to the count stored at a 1-based Fenwick tree position."""
+    while position < len(tree):
+        tree[position] += delta
+        position += position & (-position)
+
+
+def _fenwick_prefix(tree, position):
+    """Return the total count stored at positions 1..position."""
+    total = 0
+    while position > 0:
+        total += tree[position]
+        position -= position & (-position)
+    return total
+
+
+def _fenwick_find(tree, k):
+    """Return the smallest position whose prefix total reaches k (k >= 1)."""
+    position = 0
+    step = 1
+    while step * 2 < len(tree):
+        step *= 2
+
+    while step > 0:
+        next_position = position + step
+        if next_position < len(tree) and tree[next_position] < k:
+            position = next_position
+            k -= tree[next_position]
+        step //= 2
+
+    return position + 1
+
+
+def _grow_rank_board(board, xp):
+    """Double the board's XP range until xp fits, rebuilding the tree in O(size)."""
+    size = board["size"]
+    while xp >= size:
+        size *= 2
+
+    tree = [0] * (size + 1)
+    for bucket_xp, entries in board["buckets"].items():
+        tree[bucket_xp + 1] = len(entries)
+    for position in range(1, size + 1):
+        parent = position + (position & (-position))
+        if parent <= size:
+            tree[parent] += tree[position]
+
+    board["size"] = size
+    board["tree"] = tree
+
+
+def expire_rank_board(board, now=None):
+    """Drop entries that have fallen out of a windowed board's time window."""
+    if board["window"] is None:
+        return
+    if now is None:
+        now = clock()
+
+    cutoff = now - board["window"]
+    queue = board["queue"]
+    while len(queue) > 0 and queue[0][0] <= cutoff:
+        timestamp, xp = queue.popleft()
+
+        # Entries arrive in time order, so the oldest in the bucket is this one
+        bucket = board["buckets"][xp]
+        bucket.popleft()
+        if len(bucket) == 0:
+            del board["buckets"][xp]
+
+        _fenwick_add(board["tree"], xp + 1, -1)
+        board["count"] -= 1
+        board["version"] = next(BOARD_VERSION_STAMPS)
+
+
+def rank_board_add(board, xp, entry, now=None):
+    """
+    Add an entry with the given XP to a board in O(log n).
+    Windowed boards expire entries in the order they were added, so their
+    times must not go backwards. An entry added with an earlier time than
+    the one before it is given that later time (it expires a little late
+    rather than throwing off the expiry of other entries).
+    """
+    if now is None:
+        now = clock()
+    expire_rank_board(board, now)
+
+    xp = max(0, int(xp))
+    if xp >= board["size"]:
+        _grow_rank_board(board, xp)
+
+    _fenwick_add(board["tree"], xp + 1, 1)
+    board["buckets"].setdefault(xp, deque()).append(entry)
+    if board["window"] is not None:
+        queue = board["queue"]
+        if len(queue) > 0 and now < queue[-1][0]:
+            now = queue[-1][0]   # Keep the queue in time order
+        queue.append((now, xp))
+    board["count"] += 1
+    board["version"] = next(BOARD_VERSION_STAMPS)
+
+
+def rank_board_rank(board, xp, now=None):
+    """
+    Find where a score ranks on a board in O(log n).
+
+    Returns:
+        A tuple (rank, percentile, sessions): rank 1 is the best, percentile
+        is the share of entries scoring the same or lower, and sessions is
+        how many entries the board holds - one per finished quiz, so a
+        player who played three times is counted three times.
+    """
+    expire_rank_board(board, now)
+
+    count = board["count"]
+    if count == 0:
+        return 1, 100.0, 0
+
+    xp = max(0, int(xp))
+    at_or_below = _fenwick_prefix(board["tree"], min(xp + 1, board["size"]))
+    rank = count - at_or_below + 1
+    percentile = at_or_below / count * 100
+    return rank, percentile, count
+
+
+def rank_board_top(board, limit=10, now=None):
+    """
+    Return the best `limit` entries, highest XP first.
+    Each step jumps straight to the next lower XP value using the tree, so
+    this costs O(limit * log n) however many entries the board has.
+    """
+    expire_rank_board(board, now)
+
+    top_entries = []
+    while len(top_entries) < limit and len(top_entries) < board["count"]:
+        # The (count - taken)-th smallest entry is the next best one
+        position = _fenwick_find(board["tree"], board["count"] - len(top_entries))
+        for entry in board["buckets"][position - 1]:
+            top_entries.append(entry)
+            if len(top_entries) == limit:
+                break
+
+    return top_entries
+
+
+def create_leaderboards():
+    """
+    Create the full set of boards: all-time, each time window in
+    LEADERBOARD_WINDOWS, and one all-time board per teaching mode (created
+    the first time that mode is played).
+    """
+    leaderboards = {"all_time": create_rank_board("All-Time"), "modes": {}}
+    for key, (name, window_seconds) in LEADERBOARD_WINDOWS.items():
+        leaderboards[key] = create_rank_board(name, window_seconds)
+    return leaderboards
+
+
+def mode_leaderboard(leaderboards, mode_name):
+    """Return the board for one teaching mode, creating it if needed."""
+    if mode_name not in leaderboards["modes"]:
+        leaderboards["modes"][mode_name] = create_rank_board(mode_name)
+    return leaderboards["modes"][mode_name]
+
+
+def record_leaderboard_entry(leaderboards, record, now=None):
+    """
+    Add a finished SessionRecord from run_quiz() to every board it belongs on.
+    Records should be added in time order; see rank_board_add() for what
+    happens to one that arrives out of order.
+    """
+    if now is None:
+        now = clock()
+
+    mode_name = get_teaching_modes()[record.mode_num]["name"]
+    rank_board_add(leaderboards["all_time"], record.xp, record, now)
+    for key in LEADERBOARD_WINDOWS:
+        rank_board_add(leaderboards[key], record.xp, record, now)
+    rank_board_add(mode_leaderboard(leaderboards, mode_name), record.xp, record, now)
+
+
+def leaderboard_row_fields(entry):
+    """
+    Return (name, score text, xp) for a leaderboard entry, which is either a
+    SessionRecord or a result dictionary (such as a team result).
+    """
+    if isinstance(entry, SessionRecord):
+        return entry.player, record_score_text(entry), entry.xp
+    return entry["name"], entry["score"], entry["xp"]
+
+
+# ============================================================================
+# SECTION 11: SHARDED LEADERBOARDS
+# ============================================================================
+# When quiz sessions run in several worker processes, each worker keeps only
+# its own top K scores (a small min-heap). A coordinator asks every shard for
+# its top K over a multiprocessing Pipe and merges them. Any score in the
+# global top K must also be in its own shard's top K, so the merge is exact
+# while only K entries per shard ever cross a process boundary.
+#
+# There are two ways to set this up:
+#   - Quiz workers as shards: create_worker_shard_pipes() gives each worker
+#     its own Pipe end. Workers add their own results with shard_add() and
+#     call serve_shard_requests() between sessions, so results never pass
+#     through the coordinator.
+#   - Dedicated shard processes: start_sharded_leaderboard() starts them and
+#     sharded_add() sends each result to one of them.
+# ============================================================================
+
+def create_leaderboard_shard(k=10):
+    """Create an empty shard that remembers the best k entries it has seen."""
+    return {"k": k, "heap": [], "added": 0}
+
+
+def shard_add(shard, xp, entry):
+    """
+    Offer an entry to a shard in O(log k).
+    The heap is keyed on (xp, -arrival) so that on equal XP the entry that
+    arrived first is kept, matching the order of the ranked boards.
+    """
+    item = (xp, -shard["added"], entry)
+    shard["added"] += 1
+
+    if len(shard["heap"]) < shard["k"]:
+        heapq.heappush(shard["heap"], item)
+    else:
+        heapq.heappushpop(shard["heap"], item)  # Drops the lowest score
+
+
+def shard_top(shard):
+    """Return the shard's entries as [xp, entry] pairs, highest XP first."""
+    ordered = sorted(shard["heap"], reverse=True)
+    return [[xp, entry] for xp, order, entry in ordered]
+
+
+def merge_shard_tops(shard_tops, k):
+    """Merge several shards' top lists into the global top k [xp, entry] pairs."""
+    all_pairs = []
+    for top in shard_tops:
+        all_pairs.extend(top)
+    return heapq.nlargest(k, all_pairs, key=lambda pair: pair[0])
+
+
+def serve_shard_requests(conn, shard, block=False):
+    """
+    Answer messages from the coordinator on a shard's end of a Pipe.
+    A worker that runs quiz sessions can call this between sessions with
+    block=False; a dedicated shard process calls it with block=True.
+
+    Messages:
+        ("add", xp, entry) : Offer an entry to the shard
+        ("top",)           : Reply with shard_top(shard)
+        ("stop",)          : Reply with shard_top(shard) and stop serving
+
+    Returns:
+        False once a stop message was handled, otherwise True.
+    """
+    while block or conn.poll():
+        message = conn.recv()
+        kind = message[0]
+
+        if kind == "add":
+            shard_add(shard, message[1], message[2])
+        elif kind == "top":
+            conn.send(shard_top(shard))
+        elif kind == "stop":
+            conn.send(shard_top(shard))
+            return False
+
+    return True
+
+
+def leaderboard_shard_worker(conn, k):
+    """Process entry point for a dedicated leaderboard shard."""
+    shard = create_leaderboard_shard(k)
+    serve_shard_requests(conn, shard, block=True)
+    conn.close()
+
+
+def create_shard_coordinator(connections, k=10):
+    """
+    Create a coordinator over Pipe ends that already lead to shards, such as
+    quiz worker processes that keep their own shard.
+    The coordinator keeps a Pipe to every shard and the last merged result.
+    """
+    return {
+        "k": k,
+        "connections": list(connections),
+        "processes": [],     # Shard processes this coordinator started itself
+        "global_top": [],
+        "merged_at": None
+    }
+
+
+def create_worker_shard_pipes(num_workers, k=10):
+    """
+    Set up merging for quiz workers that each keep a local shard.
+
+    Returns:
+        (coordinator, worker_connections): pass one connection to each worker
+        process. The worker keeps a shard from create_leaderboard_shard(k),
+        adds its own results with shard_add(), and calls
+        serve_shard_requests(conn, shard) between sessions. When it has no
+        more sessions it calls serve_shard_requests(conn, shard, block=True)
+        so it can answer until stop_sharded_leaderboard() is called. Once
+        serve_shard_requests() returns False the shard has been stopped and
+        must not be served again.
+    """
+    coordinator_ends = []
+    worker_ends = []
+    for worker_index in range(num_workers):
+        coordinator_conn, worker_conn = multiprocessing.Pipe()
+        coordinator_ends.append(coordinator_conn)
+        worker_ends.append(worker_conn)
+
+    return create_shard_coordinator(coordinator_ends, k), worker_ends
+
+
+def start_sharded_leaderboard(num_shards, k=10):
+    """
+    Start one dedicated shard process per shard and return the coordinator.
+    Results are sent to the shards with sharded_add().
+    """
+    coordinator = create_shard_coordinator([], k)
+
+    for shard_index in range(num_shards):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=leaderboard_shard_worker,
+                                          args=(child_conn, k), daemon=True)
+        process.start()
+        child_conn.close()  # Only the shard process uses this end
+
+        coordinator["connections"].append(parent_conn)
+        coordinator["processes"].append(process)
+
+    return coordinator
+
+
+def sharded_add(coordinator, xp, entry, shard_index=None):
+    """
+    Send a session result to a dedicated shard process. By default the
+    player's name picks the shard, so each player's scores always land on the
+    same shard. Only for coordinators from start_sharded_leaderboard() - quiz
+    workers that are shards add their own results with shard_add().
+    """
+    if len(coordinator["processes"]) == 0:
+        raise ValueError("sharded_add() needs dedicated shard processes; "
+                         "worker shards add their own results with shard_add()")
+    if shard_index is None:
+        name = entry.player if isinstance(entry, SessionRecord) else entry["name"]
+        shard_index = zlib.crc32(name.encode("utf-8")) % len(coordinator["connections"])
+    coordinator["connections"][shard_index].send(("add", xp, entry))
+
+
+def merge_sharded_leaderboard(coordinator, max_age=None):
+    """
+    Return the global top k as [xp, entry] pairs, highest XP first.
+
+    Parameters:
+        coordinator : From start_sharded_leaderboard() or
+                      create_worker_shard_pipes()
+        max_age     : Reuse the last merge if it is newer than this many
+                      seconds (for periodic refreshes); None always merges
+    """
+    now = time.time()
+    if (max_age is not None and coordinator["merged_at"] is not None
+            and now - coordinator["merged_at"] < max_age):
+        return coordinator["global_top"]
+
+    # Ask every shard first, then collect, so the shards work in parallel
+    for conn in coordinator["connections"]:
+        conn.send(("top",))
+    shard_tops = [conn.recv() for conn in coordinator["connections"]]
+
+    coordinator["global_top"] = merge_shard_tops(shard_tops, coordinator["k"])
+    coordinator["merged_at"] = now
+    return coordinator["global_top"]
+
+
+def stop_sharded_leaderboard(coordinator):
+    """
+    Tell every shard to stop, wait for the shard processes this coordinator
+    started, and return the final global top k.
+    """
+    for conn in coordinator["connections"]:
+        conn.send(("stop",))
+    shard_tops = [conn.recv() for conn in coordinator["connections"]]
+
+    for conn in coordinator["connections"]:
+        conn.close()
+    for process in coordinator["processes"]:
+        process.join()
+
+    coordinator["global_top"] = merge_shard_tops(shard_tops, coordinator["k"])
+    return coordinator["global_top"]
+
+
+# ============================================================================
+# SECTION 12: QUIZ DATA ACCESS
+# ============================================================================
+# The question bank module is imported on first use of the data rather than
+# when this module is imported, so tools that never touch the questions (the
+# replay harness, the leaderboard workers) do not pay for building them.
+# ============================================================================
+
+_quiz_data = None   # Loaded on first access by load_quiz_data()
+
+
+def load_quiz_data():
+    """
+    Return the quiz data, importing learnova_question_bank on first call.
+    Returns a dictionary with "question_bank", "teaching_modes" and "badges".
+    """
+    global _quiz_data
+    if _quiz_data is None:
+        import learnova_question_bank
+
+        _quiz_data = {
+            "question_bank": learnova_question_bank.QUESTION_BANK,
+            "teaching_modes": learnova_question_bank.TEACHING_MODES,
+            "badges": learnova_question_bank.BADGES
+        }
+    return _quiz_data
+
+
+def get_question_bank():
+    """Return the list of question dictionaries (see learnova_question_bank.py)."""
+    return load_quiz_data()["question_bank"]
+
+
+def get_teaching_modes():
+    """Return the teaching modes dictionary (see learnova_question_bank.py)."""
+    return load_quiz_data()["teaching_modes"]
+
+
+def get_badges():
+    """Return the badge definitions dictionary (see learnova_question_bank.py)."""
+    return load_quiz_data()["badges"]
+
+
+def __getattr__(name):
+    """
+    Keep learnova_quiz.QUESTION_BANK, TEACHING_MODES and BADGES working for
+    code that imports this module - they are loaded on first access.
+    """
+    if name == "QUESTION_BANK":
+        return get_question_bank()
+    if name == "TEACHING_MODES":
+        return get_teaching_modes()
+    if name == "BADGES":
+        return get_badges()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ============================================================================
+# SECTION 13: OFFLINE ANSWER SHEET GRADING
+# ============================================================================
+# Classes that take the quiz on paper or offline devices upload their answer
+# sheets afterwards as a CSV or JSONL file of rows:
+#     student, question_id, answer, time
+# (question_id is the question's position in the question bank, time is the
+# seconds spent on the question). The grader reads the file once, line by
+# line, and applies the same scoring as run_quiz: calculate_grade(),
+# calculate_xp() and award_badges(). Memory does not grow with the number of
+# rows - only one small state per student whose rows are still being read.
+#
+# For parallel grading the file is split into byte ranges on line boundaries
+# and each range is graded in its own process. A student whose rows cross a
+# range boundary gets two partial states, which are merged afterwards. Streaks
+# merge exactly too: each state remembers its leading run of correct answers,
+# its trailing run, and its longest run.
+# ============================================================================
+
+GRADING_COLUMNS = ["student", "question_id", "answer", "time"]
+
+
+def _create_grading_state():
+    """Create the running totals kept for one student while grading."""
+    return {
+        "correct": 0,
+        "answered": 0,
+        "total_time": 0.0,
+        "fast_answers": 0,      # Answers under 5 seconds (see calculate_xp)
+        "leading_streak": 0,    # Correct answers before the first wrong one
+        "current_streak": 0,    # Correct answers since the last wrong one
+        "max_streak": 0,
+        "topic_scores": {}      # topic -> [correct, total]
+    }
+
+
+def _grade_answer(state, question, answer, time_taken):
+    """Add one answer to a student's grading state."""
+    is_correct = (answer == question["ans"])
+
+    if is_correct:
+        if state["leading_streak"] == state["answered"]:
+            state["leading_streak"] += 1
+        state["correct"] += 1
+        state["current_streak"] += 1
+        if state["current_streak"] > state["max_streak"]:
+            state["max_streak"] = state["current_streak"]
+    else:
+        state["current_streak"] = 0
+
+    state["answered"] += 1
+    state["total_time"] += time_taken
+    if time_taken < 5.0:
+        state["fast_answers"] += 1
+
+    scores = state["topic_scores"].setdefault(question["topic"], [0, 0])
+    scores[1] += 1
+    if is_correct:
+        scores[0] += 1
+
+
+def _merge_grading_states(first, second):
+    """
+    Combine two partial states of the same student, where `first` holds the
+    earlier rows. Returns the merged state.
+    """
+    merged = _create_grading_state()
+    merged["correct"] = first["correct"] + second["correct"]
+    merged["answered"] = first["answered"] + second["answered"]
+    merged["total_time"] = first["total_time"] + second["total_time"]
+    merged["fast_answers"] = first["fast_answers"] + second["fast_answers"]
+
+    # A run can continue across the join: first's trailing + second's leading
+    merged["max_streak"] = max(first["max_streak"], second["max_streak"],
+                               first["current_streak"] + second["leading_streak"])
+
+    if first["leading_streak"] == first["answered"]:
+        merged["leading_streak"] = first["answered"] + second["leading_streak"]
+    else:
+        merged["leading_streak"] = first["leading_streak"]
+
+    if second["current_streak"] == second["answered"]:
+        merged["current_streak"] = second["answered"] + first["current_streak"]
+    else:
+        merged["current_streak"] = second["current_streak"]
+
+    for source in (first, second):
+        for topic, scores in source["topic_scores"].items():
+            merged_scores = merged["topic_scores"].setdefault(topic, [0, 0])
+            merged_scores[0] += scores[0]
+            merged_scores[1] += scores[1]
+
+    return merged
+
+
+def _finish_grading_state(student, state, mode_num):
+    """Score a student's completed answer sheet, exactly as run_quiz would."""
+    mode_settings = get_teaching_modes()[mode_num]
+    total_questions = state["answered"]
+    total_time = state["total_time"]
+    # calculate_xp() and award_badges() only count the answers under 5
+    # seconds, so one short time per fast answer stands in for every time
+    fast_times = [0.0] * state["fast_answers"]
+
+    if total_questions > 0:
+        percentage = (state["correct"] / total_questions) * 100
+    else:
+        percentage = 0.0
+
+    grade = calculate_grade(percentage)
+    xp_info = calculate_xp(state["correct"], fast_times, mode_settings,
+                           state["max_streak"])
+    badges_earned = award_badges(
+        state["correct"], total_questions, total_time, fast_times,
+        state["max_streak"], mode_num, 1, state["topic_scores"]
+    )
+
+    return {
+        "student": student,
+        "score": f"{state['correct']}/{total_questions}",
+        "percentage": round(percentage, 1),
+        "grade": grade,
+        "xp": xp_info["total_xp"],
+        "badges": [badge["name"] for badge in badges_earned],
+        "time": round(total_time, 2)
+    }
+
+
+def _answer_file_layout(path):
+    """
+    Work out where the answer rows start and how to read them.
+    Returns (is_csv, offset of the first data row, column positions).
+    """
+    is_csv = path.lower().endswith(".csv")
+    if not is_csv:
+        return False, 0, None
+
+    import csv
+
+    with open(path, "rb") as answer_file:
+        header_line = answer_file.readline()
+    header = next(csv.reader([header_line.decode("utf-8-sig")]))
+    header = [column.strip().lower() for column in header]
+
+    positions = []
+    for column in GRADING_COLUMNS:
+        if column not in header:
+            raise ValueError(f"{path} has no '{column}' column")
+        positions.append(header.index(column))
+    return True, len(header_line), positions
+
+
+def _answer_chunk_bounds(path, data_start, chunk_count):
+    """Split the data rows into chunk_count byte ranges that end on line breaks."""
+    file_size = os.path.getsize(path)
+    bounds = [data_start]
+
+    with open(path, "rb") as answer_file:
+        for chunk in range(1, chunk_count):
+            target = data_start + (file_size - data_start) * chunk // chunk_count
+            if target <= bounds[-1]:
+                continue
+            answer_file.seek(target - 1)
+            answer_file.readline()  # Move to the start of the next full line
+            position = answer_file.tell()
+            if bounds[-1] < position < file_size:
+                bounds.append(position)
+
+    bounds.append(file_size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+def _read_answer_rows(path, start, end, is_csv, positions):
+    """
+    Yield (student, question_id, answer, time) strings for every row whose
+    line starts in the byte range [start, end). Blank lines are skipped.
+    """
+    import csv
+
+    def lines_in_range(answer_file):
+        position = start
+        for raw_line in answer_file:
+            if position >= end:
+                break
+            position += len(raw_line)
+            line = raw_line.decode("utf-8").strip()
+            if line != "":
+                yield line
+
+    with open(path, "rb") as answer_file:
+        answer_file.seek(start)
+
+        if is_csv:
+            for row in csv.reader(lines_in_range(answer_file)):
+                if len(row) <= max(positions):
+                    yield None
+                    continue
+                yield [row[position] for position in positions]
+        else:
+            for line in lines_in_range(answer_file):
+                try:
+                    record = json.loads(line)
+                    yield [record[column] for column in GRADING_COLUMNS]
+                except (ValueError, KeyError, TypeError):
+                    yield None
+
+
+def _grade_chunk(task):
+    """
+    Grade one byte range of an answer file (runs in a worker process).
+
+    In a file grouped by student, every student that starts and ends inside
+    the range is finished here and written to the range's part file. The
+    first and last students may continue in the neighbouring ranges, so
+    they are returned as partial states instead. In an ungrouped file every
+    student is returned as a partial state.
+
+    Returns:
+        (partial states as [student, state] pairs in file order,
+         number of rows graded, number of rows skipped)
+    """
+    path, start, end, is_csv, positions, mode_num, part_path, grouped = task
+    question_bank = get_question_bank()
+
+    states = {}
+    first_student = None
+    current_student = None
+    rows = 0
+    skipped = 0
+
+    with open(part_path, "w", encoding="utf-8") as part_file:
+        for row in _read_answer_rows(path, start, end, is_csv, positions):
+            try:
+                student = str(row[0]).strip()
+                question_id = int(row[1])
+                answer = str(row[2]).strip().upper()
+                time_taken = float(row[3])
+            except (TypeError, ValueError, IndexError):
+                skipped += 1
+                continue
+
+            # Negative ids would silently index from the end of the bank
+            if question_id < 0 or question_id >= len(question_bank):
+                skipped += 1
+                continue
+            question = question_bank[question_id]
+
+            if grouped and student != current_student:
+                # The previous student's sheet is complete - unless it may
+                # have started in the previous range
+                if current_student is not None and current_student != first_student:
+                    result = _finish_grading_state(current_student,
+                                                   states.pop(current_student), mode_num)
+                    part_file.write(json.dumps(result) + "\n")
+                if first_student is None:
+                    first_student = student
+                current_student = student
+
+            if student not in states:
+                states[student] = _create_grading_state()
+            _grade_answer(states[student], question, answer, time_taken)
+            rows += 1
+
+    return [[student, state] for student, state in states.items()], rows, skipped
+
+
+def grade_answer_file(input_path, output_path, mode_num=1, workers=1, grouped=True):
+    """
+    Grade a CSV or JSONL file of offline answers and write one JSON line of
+    results per student (score, percentage, grade, XP, badges, time).
+
+    Parameters:
+        input_path  : Answer rows with student, question_id, answer and time
+        output_path : Where to write the per-student results (JSONL)
+        mode_num    : Teaching mode the class used (sets the XP multiplier)
+        workers     : Number of processes to grade with
+        grouped     : True if each student's rows are consecutive in the file,
+                      which keeps memory constant; False keeps one small state
+                      per student until the end of the file
+
+    Returns:
+        A dictionary with the number of students, rows graded, rows skipped,
+        and "split_students": how many students got more than one result
+        line because their rows were not consecutive in a grouped file.
+    """
+    is_csv, data_start, positions = _answer_file_layout(input_path)
+    bounds = _answer_chunk_bounds(input_path, data_start, workers)
+
+    tasks = []
+    for index, (start, end) in enumerate(bounds):
+        part_path = f"{output_path}.part{index}"
+        tasks.append((input_path, start, end, is_csv, positions, mode_num,
+                      part_path, grouped))
+
+    if workers > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+            chunk_results = pool.map(_grade_chunk, tasks)
+    else:
+        chunk_results = [_grade_chunk(task) for task in tasks]
+
+    # Merge the partial states in file order so streaks join up correctly
+    partial_states = {}
+    rows = 0
+    skipped = 0
+    for partials, chunk_rows, chunk_skipped in chunk_results:
+        rows += chunk_rows
+        skipped += chunk_skipped
+        for student, state in partials:
+            if student in partial_states:
+                partial_states[student] = _merge_grading_states(partial_states[student], state)
+            else:
+                partial_states[student] = state
+
+    # Collect the finished students from every part file, then the rest.
+    # Names are remembered to notice students whose rows were not together.
+    students = 0
+    seen_students = set()
+    split_students = set()
+    with open(output_path, "w", encoding="utf-8") as output_file:
+        for task in tasks:
+            part_path = task[6]
+            with open(part_path, "r", encoding="utf-8") as part_file:
+                for line in part_file:
+                    student = json.loads(line)["student"]
+                    if student in seen_students:
+                        split_students.add(student)
+                    seen_students.add(student)
+                    output_file.write(line)
+                    students += 1
+            os.remove(part_path)
+
+        for student, state in partial_states.items():
+            if student in seen_students:
+                split_students.add(student)
+            result = _finish_grading_state(student, state, mode_num)
+            output_file.write(json.dumps(result) + "\n")
+            students += 1
+
+    return {"students": students, "rows": rows, "skipped": skipped,
+            "split_students": len(split_students)}
+
+
+def run_grader_command(arguments):
+    """
+    Command-line front end for grade_answer_file():
+        learnova_quiz.py --grade ANSWERS RESULTS [--mode N] [--workers N] [--ungrouped]
+    """
+    if len(arguments) < 2:
+        print("  Usage: learnova_quiz.py --grade ANSWERS RESULTS "
+              "[--mode N] [--workers N] [--ungrouped]")
+        print("  By default each student's rows must be consecutive in the file;")
+        print("  use --ungrouped if they are mixed, or a student is graded in pieces.")
+        return
+
+    mode_num = 1
+    workers = 1
+    if "--mode" in arguments:
+        mode_num = int(arguments[arguments.index("--mode") + 1])
+    if "--workers" in arguments:
+        workers = int(arguments[arguments.index("--workers") + 1])
+    grouped = "--ungrouped" not in arguments
+
+    start_time = time.time()
+    summary = grade_answer_file(arguments[0], arguments[1], mode_num, workers, grouped)
+    elapsed = time.time() - start_time
+
+    print(f"  Graded {summary['rows']} answers for {summary['students']} students "
+          f"in {elapsed:.1f} seconds ({summary['skipped']} rows skipped).")
+    if summary["split_students"] > 0:
+        print(f"  Warning: {summary['split_students']} students' rows were not consecutive, "
+              "so they have more than one result line. Grade again with --ungrouped.")
+
+
+# ============================================================================
+# SECTION 14: TEAM SESSIONS
+# ============================================================================
+# In a real Team Mode classroom every team member answers each question on
+# their own device, and the team's answer is decided by a rule:
+#   - "majority" : the answer most members chose (decided early as soon as
+#                  one answer has more than half of the team)
+#   - "first"    : whichever member answers first
+#   - "captain"  : the team captain's answer
+# Every incoming answer updates its team's vote counts in O(1), so a question
+# is resolved without re-counting anything, even for 40 teams of 30 members.
+# At the end each team is scored like a single player, and team XP is either
+# shared (every member gets it all) or split evenly between the members.
+# ============================================================================
+
+TEAM_RULES = ["majority", "first", "captain"]
+TEAM_XP_SHARING = ["shared", "split"]
+
+
+def create_team_session(teams, rule="majority", xp_sharing="split", captains=None,
+                        mode_num=4):
+    """
+    Set up a team quiz session.
+
+    Parameters:
+        teams      : Dictionary mapping team names to lists of member names
+        rule       : How a team's answer is decided (one of TEAM_RULES)
+        xp_sharing : "shared" or "split" (see TEAM_XP_SHARING)
+        captains   : Dictionary mapping team names to their captain; teams
+                     without one use their first member
+        mode_num   : Teaching mode used for XP and badges (default Team Mode)
+
+    Returns:
+        The session dictionary used by the other team functions.
+    """
+    if rule not in TEAM_RULES:
+        raise ValueError(f"Unknown team rule '{rule}'. Choose from {TEAM_RULES}.")
+    if xp_sharing not in TEAM_XP_SHARING:
+        raise ValueError(f"Unknown XP sharing '{xp_sharing}'. Choose from {TEAM_XP_SHARING}.")
+    if captains is None:
+        captains = {}
+    for team_name, member_names in teams.items():
+        if len(member_names) == 0:
+            raise ValueError(f"Team '{team_name}' has no members.")
+    for team_name, captain in captains.items():
+        if team_name not in teams:
+            raise ValueError(f"Captain given for unknown team '{team_name}'.")
+        if captain not in teams[team_name]:
+            raise ValueError(f"Captain '{captain}' is not on team '{team_name}'.")
+
+    session = {
+        "rule": rule,
+        "xp_sharing": xp_sharing,
+        "mode_num": mode_num,
+        "question": None,       # The question currently open for answers
+        "asked": 0,
+        "teams": {},
+        "members": {}           # member -> their team name and own totals
+    }
+
+    for team_name, member_names in teams.items():
+        session["teams"][team_name] = {
+            "members": list(member_names),
+            "captain": captains.get(team_name, member_names[0]),
+            "correct": 0,
+            "current_streak": 0,
+            "max_streak": 0,
+            "times": array("d"),
+            "topic_scores": {},
+            # Vote state for the open question - reset by open_team_question()
+            "votes": {},
+            "leader": None,
+            "leader_votes": 0,
+            "responded": set(),
+            "decided": None,
+            "decided_time": 0.0,
+            "last_time": 0.0
+        }
+
+        for member in member_names:
+            if member in session["members"]:
+                raise ValueError(f"'{member}' is on more than one team.")
+            session["members"][member] = {"team": team_name, "answered": 0, "correct": 0}
+
+    return session
+
+
+def open_team_question(session, question):
+    """Start collecting answers for a question (a question bank dictionary)."""
+    session["question"] = question
+    session["asked"] += 1
+
+    for team in session["teams"].values():
+        team["votes"] = {}
+        team["leader"] = None
+        team["leader_votes"] = 0
+        team["responded"] = set()
+        team["decided"] = None
+        team["decided_time"] = 0.0
+        team["last_time"] = 0.0
+
+
+def submit_team_answer(session, member, answer, time_taken):
+    """
+    Record one member's answer to the open question in O(1).
+    Each member's first answer counts; repeats are ignored.
+
+    Returns:
+        True if this answer decided the team's answer, otherwise False.
+    """
+    if session["question"] is None:
+        raise ValueError("No question is open - call open_team_question() first.")
+    if member not in session["members"]:
+        raise ValueError(f"'{member}' is not on any team.")
+
+    member_info = session["members"][member]
+    team = session["teams"][member_info["team"]]
+
+    if member in team["responded"]:
+        return False
+    team["responded"].add(member)
+    team["last_time"] = time_taken
+
+    # The member's own record counts even after the team has decided
+    member_info["answered"] += 1
+    if answer == session["question"]["ans"]:
+        member_info["correct"] += 1
+
+    if team["decided"] is not None:
+        return False
+
+    # Update the vote counts and the current leading answer
+    votes = team["votes"].get(answer, 0) + 1
+    team["votes"][answer] = votes
+    if votes > team["leader_votes"]:
+        team["leader"] = answer
+        team["leader_votes"] = votes
+
+    rule = session["rule"]
+    if rule == "first":
+        decided = True
+    elif rule == "captain":
+        decided = (member == team["captain"])
+    else:
+        # Majority: decided once one answer can no longer be outvoted
+        decided = (team["leader_votes"] * 2 > len(team["members"])
+                   or len(team["responded"]) == len(team["members"]))
+        answer = team["leader"]
+
+    if decided:
+        team["decided"] = answer
+        team["decided_time"] = time_taken
+    return decided
+
+
+def resolve_team_question(session):
+    """
+    Close the open question and score it for every team.
+    Teams that have not decided yet use their leading answer (the captain
+    rule falls back to this if the captain did not answer); teams with no
+    answers at all time out. A timeout is recorded as taking forever, so a
+    missed question never earns speed XP or the Speed Demon and Quick
+    Thinker badges.
+
+    Returns:
+        A dictionary mapping team names to (team answer, True/False correct).
+    """
+    question = session["question"]
+    outcome = {}
+
+    for team_name, team in session["teams"].items():
+        answer = team["decided"]
+        time_taken = team["decided_time"]
+        if answer is None and team["leader"] is not None:
+            answer = team["leader"]
+            time_taken = team["last_time"]
+        elif answer is None:
+            answer = "TIMEOUT"
+            time_taken = float("inf")
+
+        is_correct = (answer == question["ans"])
+        team["times"].append(time_taken)
+
+        scores = team["topic_scores"].setdefault(question["topic"], [0, 0])
+        scores[1] += 1
+        if is_correct:
+            scores[0] += 1
+            team["correct"] += 1
+            team["current_streak"] += 1
+            if team["current_streak"] > team["max_streak"]:
+                team["max_streak"] = team["current_streak"]
+        else:
+            team["current_streak"] = 0
+
+        outcome[team_name] = (answer, is_correct)
+
+    session["question"] = None
+    return outcome
+
+
+def finish_team_session(session):
+    """
+    Score every team like a single player and hand out member XP.
+    Team and member results are also placed on their own ranked boards.
+
+    Returns:
+        A dictionary with "teams" and "members" result lists, and the
+        "team_board" and "member_board" rank boards for display_leaderboard().
+    """
+    mode_settings = get_teaching_modes()[session["mode_num"]]
+    total_questions = session["asked"]
+    team_board = create_rank_board("Teams")
+    member_board = create_rank_board("Team Members")
+    team_results = []
+    member_results = []
+
+    for team_name, team in session["teams"].items():
+        if total_questions > 0:
+            percentage = (team["correct"] / total_questions) * 100
+        else:
+            percentage = 0.0
+
+        xp_info = calculate_xp(team["correct"], team["times"], mode_settings,
+                               team["max_streak"])
+        badges_earned = award_badges(
+            team["correct"], total_questions, sum(team["times"]), team["times"],
+            team["max_streak"], session["mode_num"], 1, team["topic_scores"]
+        )
+
+        team_result = {
+            "name": team_name,
+            "score": f"{team['correct']}/{total_questions}",
+            "percentage": percentage,
+            "grade": calculate_grade(percentage),
+            "xp": xp_info["total_xp"],
+            "badges": len(badges_earned),
+            "members": len(team["members"])
+        }
+        team_results.append(team_result)
+        rank_board_add(team_board, team_result["xp"], team_result)
+
+        # Shared: everyone gets the team XP. Split: divide it evenly, giving
+        # any remainder to the first members one point each.
+        member_count = len(team["members"])
+        for position, member in enumerate(team["members"]):
+            if session["xp_sharing"] == "shared":
+                member_xp = team_result["xp"]
+            else:
+                member_xp = team_result["xp"] // member_count
+                if position < team_result["xp"] % member_count:
+                    member_xp += 1
+
+            member_info = session["members"][member]
+            member_result = {
+                "name": member,
+                "team": team_name,
+                "score": f"{member_info['correct']}/{member_info['answered']}",
+                "xp": member_xp
+            }
+            member_results.append(member_result)
+            rank_board_add(member_board, member_xp, member_result)
+
+    return {
+        "teams": team_results,
+        "members": member_results,
+        "team_board": team_board,
+        "member_board": member_board
+    }
+
+
+# ============================================================================
+# SECTION 15: INPUT TRACES & REPLAY
+# ============================================================================
+# A trace is one recorded run of main(): the random seed, every line typed,
+# and how long the player took to type it. While recording, the program runs
+# on a virtual clock that only moves forward by those typing times, so every
+# timing the program sees (answer times, timeouts, quiz duration) is stored
+# in the trace too. Replaying feeds the same lines on the same virtual clock
+# with no waiting, as fast as the CPU allows, and compares a fingerprint of
+# everything printed with the one taken while recording. Any difference is a
+# behavior change in the interactive path.
+# Checkpoints are turned off while recording or replaying.
+# ============================================================================
+
+TRACE_VERSION = 1
+
+
+class _TeeWriter:
+    """Send printed text to the screen and to a capture buffer at once."""
+
+    def __init__(self, screen, capture):
+        self.screen = screen
+        self.capture = capture
+
+    def write(self, text):
+        self.capture.write(text)
+        return self.screen.write(text)
+
+    def flush(self):
+        self.screen.flush()
+
+
+def _run_with_hooks(input_hook, clock_hook, seed, output):
+    """
+    Run main() once with the given input and clock hooks and the random
+    seed, sending everything printed to `output`. The previous hooks and
+    settings are always restored afterwards.
+    """
+    import contextlib
+
+    global CHECKPOINT_DIR
+    saved_hooks = dict(IO_HOOKS)
+    saved_checkpoint_dir = CHECKPOINT_DIR
+    saved_random_state = random.getstate()
+
+    IO_HOOKS["input"] = input_hook
+    IO_HOOKS["clock"] = clock_hook
+    CHECKPOINT_DIR = None
+    random.seed(seed)
+    try:
+        with contextlib.redirect_stdout(output):
+            main()
+    finally:
+        IO_HOOKS.update(saved_hooks)
+        CHECKPOINT_DIR = saved_checkpoint_dir
+        random.setstate(saved_random_state)
+
+
+def record_trace(trace_path):
+    """
+    Play the game normally while recording it, then append the finished
+    trace as one JSON line to trace_path. Interrupted runs are not saved.
+    """
+    import hashlib
+    import io
+
+    seed = int.from_bytes(os.urandom(4), "big")
+    start = round(time.time(), 3)
+    virtual_time = [start]
+    events = []
+
+    def recording_input(prompt):
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        wait_start = time.time()
+        line = sys.stdin.readline()
+        if line == "":
+            raise EOFError
+        waited = round(time.time() - wait_start, 3)
+
+        line = line.rstrip("\n")
+        events.append([line, waited])
+        virtual_time[0] += waited
+        return line
+
+    capture = io.StringIO()
+    _run_with_hooks(recording_input, lambda: virtual_time[0], seed,
+                    _TeeWriter(sys.stdout, capture))
+
+    trace = {
+        "v": TRACE_VERSION,
+        "seed": seed,
+        "start": start,
+        "events": events,
+        "output": hashlib.sha1(capture.getvalue().encode("utf-8")).hexdigest()
+    }
+    with open(trace_path, "a", encoding="utf-8") as trace_file:
+        trace_file.write(json.dumps(trace, separators=(",", ":")) + "\n")
+    print(f"\n  Trace saved to {trace_path} ({len(events)} inputs).")
+
+
+def replay_trace(trace):
+    """
+    Replay one trace (a dictionary loaded from a trace file).
+
+    Returns:
+        None if the run printed exactly what was recorded, otherwise a short
+        description of what went wrong.
+    """
+    import hashlib
+    import io
+
+    events = trace["events"]
+    position = [0]
+    virtual_time = [trace["start"]]
+
+    def replay_input(prompt):
+        sys.stdout.write(prompt)
+        if position[0] >= len(events):
+            raise EOFError("trace ran out of input")
+        line, waited = events[position[0]]
+        position[0] += 1
+        virtual_time[0] += waited
+        return line
+
+    capture = io.StringIO()
+    try:
+        _run_with_hooks(replay_input, lambda: virtual_time[0], trace["seed"], capture)
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+
+    if position[0] != len(events):
+        return f"finished after {position[0]} of {len(events)} inputs"
+    if hashlib.sha1(capture.getvalue().encode("utf-8")).hexdigest() != trace["output"]:
+        return "output differs from the recording"
+    return None
+
+
+def replay_traces(trace_path):
+    """
+    Replay every trace in a trace file and report regressions and speed.
+
+    Returns:
+        A dictionary with the number of traces, the failures as
+        (line number, description) pairs, and the seconds taken.
+    """
+    failures = []
+    count = 0
+    start_time = time.perf_counter()
+
+    with open(trace_path, "r", encoding="utf-8") as trace_file:
+        for line_number, line in enumerate(trace_file, start=1):
+            if line.strip() == "":
+                continue
+            trace = json.loads(line)
+            if trace.get("v") != TRACE_VERSION:
+                failures.append((line_number, "unsupported trace version"))
+                continue
+
+            count += 1
+            problem = replay_trace(trace)
+            if problem is not None:
+                failures.append((line_number, problem))
+
+    seconds = time.perf_counter() - start_time
+    return {"traces": count, "failures": failures, "seconds": seconds}
+
+
+def run_replay_command(trace_path):
+    """Command-line front end for replay_traces(): prints a summary."""
+    summary = replay_traces(trace_path)
+    rate = summary["traces"] / summary["seconds"] if summary["seconds"] > 0 else 0.0
+
+    print(f"  Replayed {summary['traces']} traces in {summary['seconds']:.2f} seconds "
+          f"({rate:.0f} traces/second).")
+    for line_number, problem in summary["failures"]:
+        print(f"  Trace on line {line_number}: {problem}")
+    if len(summary["failures"]) == 0:
+        print("  All traces matched their recordings.")
+
+
+# ============================================================================
+# SECTION 16: SESSION DATA EXPORT
+# ============================================================================
+# Finished sessions can be exported for analysts as two tables:
+#   - sessions : one row per session (player, mode, score, XP, ...)
+#   - answers  : one row per answer (question, topic, answer, time, ...)
+# Rows are buffered column by column and written out in row groups of a
+# fixed size, so memory stays bounded and each write is small enough not to
+# hold up live sessions. Files are partitioned by the day the session ended
+# (folders like sessions/date=2026-02-14/). Parquet files are written when
+# the optional pyarrow package is installed; otherwise CSV files are
+# appended to in the same layout. Each exporter run writes new Parquet
+# files, and CSV files are appended to, so exports can be added to over time.
+# Once a session from a later day arrives, earlier days are written out and
+# their files closed, so a long-running classroom does not rely on a clean
+# exit to get its data on disk.
+# ============================================================================
+
+EXPORT_DIR = None   # Set to a folder to export every finished session
+
+SESSION_EXPORT_COLUMNS = [
+    ("session_id", "str"), ("player", "str"), ("mode", "str"),
+    ("questions", "int"), ("correct", "int"), ("percentage", "float"),
+    ("grade", "str"), ("xp", "int"), ("badges", "int"),
+    ("total_time", "float"), ("finished_at", "float")
+]
+ANSWER_EXPORT_COLUMNS = [
+    ("session_id", "str"), ("position", "int"), ("question_id", "int"),
+    ("topic", "str"), ("difficulty", "int"), ("answer", "str"),
+    ("correct", "bool"), ("time_taken", "float")
+]
+EXPORT_TABLES = {"sessions": SESSION_EXPORT_COLUMNS, "answers": ANSWER_EXPORT_COLUMNS}
+
+
+def create_exporter(base_dir, row_group_size=10000, file_format=None,
+                    max_buffered_rows=200000):
+    """
+    Create an exporter that writes session data under base_dir.
+
+    Parameters:
+        base_dir       : Folder to write the partitioned tables into
+        row_group_size : Rows buffered per table and day before writing
+        max_buffered_rows : Rows buffered across all tables and days before
+                            everything is written out
+        file_format    : "parquet" or "csv"; None picks Parquet when pyarrow
+                         is installed and CSV otherwise
+
+    Returns:
+        The exporter dictionary used by export_session() and close_exporter().
+    """
+    if file_format is None:
+        try:
+            import pyarrow  # noqa: F401 - only checking that it is installed
+            file_format = "parquet"
+        except ImportError:
+            file_format = "csv"
+
+    return {
+        "dir": base_dir,
+        "row_group_size": row_group_size,
+        "max_buffered_rows": max_buffered_rows,
+        "buffered_rows": 0,
+        "format": file_format,
+        "run_id": f"{int(time.time())}-{os.getpid()}",
+        "files_opened": 0,        # Numbers each Parquet file of this run
+        "latest_partition": "",   # Newest day seen so far
+        "buffers": {},    # (table, partition) -> {column: list of values}
+        "writers": {}     # (table, partition) -> open Parquet writer
+    }
+
+
+def _export_buffer(exporter, table, partition):
+    """Return the column buffer for a table and day, creating it if needed."""
+    key = (table, partition)
+    if key not in exporter["buffers"]:
+        exporter["buffers"][key] = {name: [] for name, kind in EXPORT_TABLES[table]}
+    return exporter["buffers"][key]
+
+
+def export_session(exporter, record):
+    """Buffer one finished SessionRecord and its answers for export."""
+    question_bank = get_question_bank()
+    partition = "date=" + time.strftime("%Y-%m-%d", time.gmtime(record.finished_at))
+    session_id = f"{int(record.finished_at * 1000)}-{zlib.crc32(record.player.encode('utf-8')):08x}"
+    total_questions = len(record.question_ids)
+    correct_count = record_correct_count(record)
+    percentage = (correct_count / total_questions) * 100 if total_questions > 0 else 0.0
+
+    sessions = _export_buffer(exporter, "sessions", partition)
+    sessions["session_id"].append(session_id)
+    sessions["player"].append(record.player)
+    sessions["mode"].append(get_teaching_modes()[record.mode_num]["name"])
+    sessions["questions"].append(total_questions)
+    sessions["correct"].append(correct_count)
+    sessions["percentage"].append(percentage)
+    sessions["grade"].append(calculate_grade(percentage))
+    sessions["xp"].append(record.xp)
+    sessions["badges"].append(len(record_badges(record)))
+    sessions["total_time"].append(record.total_time)
+    sessions["finished_at"].append(record.finished_at)
+
+    # Answers are added a whole column at a time rather than row by row
+    answers = _export_buffer(exporter, "answers", partition)
+    answered = len(record.answers)
+    answered_ids = record.question_ids[:answered]
+    answers["session_id"].extend([session_id] * answered)
+    answers["position"].extend(range(1, answered + 1))
+    answers["question_id"].extend(answered_ids)
+    answers["topic"].extend([question_bank[qid]["topic"] for qid in answered_ids])
+    answers["difficulty"].extend([question_bank[qid]["difficulty"] for qid in answered_ids])
+    answers["answer"].extend([record_answer_text(record, pos) for pos in range(answered)])
+    answers["correct"].extend([record_is_correct(record, pos) for pos in range(answered)])
+    answers["time_taken"].extend(record.times)
+    exporter["buffered_rows"] += 1 + answered
+
+    # Write out any buffer that has reached a full row group
+    for table in EXPORT_TABLES:
+        buffer = exporter["buffers"][(table, partition)]
+        if len(buffer["session_id"]) >= exporter["row_group_size"]:
+            flush_export_buffer(exporter, table, partition)
+
+    # Sessions spread over many days fill many small buffers; write them all
+    # out if together they hold too many rows, so memory stays bounded
+    if exporter["buffered_rows"] >= exporter["max_buffered_rows"]:
+        for table, buffered_partition in list(exporter["buffers"]):
+            flush_export_buffer(exporter, table, buffered_partition)
+
+    # A new day has started - finish the files of every earlier day
+    if partition > exporter["latest_partition"]:
+        exporter["latest_partition"] = partition
+        close_export_partitions(exporter, before=partition)
+
+
+def flush_export_buffer(exporter, table, partition):
+    """Write one table's buffered rows for one day as a single row group."""
+    buffer = exporter["buffers"].get((table, partition))
+    if buffer is None or len(buffer["session_id"]) == 0:
+        return
+
+    directory = os.path.join(exporter["dir"], table, partition)
+    os.makedirs(directory, exist_ok=True)
+    columns = EXPORT_TABLES[table]
+
+    if exporter["format"] == "parquet":
+        import pyarrow
+        import pyarrow.parquet
+
+        arrow_types = {"str": pyarrow.string(), "int": pyarrow.int64(),
+                       "float": pyarrow.float64(), "bool": pyarrow.bool_()}
+        schema = pyarrow.schema([(name, arrow_types[kind]) for name, kind in columns])
+        row_group = pyarrow.table(buffer, schema=schema)
+
+        key = (table, partition)
+        if key not in exporter["writers"]:
+            exporter["files_opened"] += 1
+            file_name = f"{table}-{exporter['run_id']}-{exporter['files_opened']}.parquet"
+            exporter["writers"][key] = pyarrow.parquet.ParquetWriter(
+                os.path.join(directory, file_name), schema)
+        exporter["writers"][key].write_table(row_group)
+    else:
+        import csv
+
+        path = os.path.join(directory, f"{table}.csv")
+        write_header = not os.path.exists(path)
+        with open(path, "a", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            if write_header:
+                writer.writerow([name for name, kind in columns])
+            writer.writerows(zip(*[buffer[name] for name, kind in columns]))
+
+    # Start the next row group with empty columns
+    exporter["buffered_rows"] -= len(buffer["session_id"])
+    for name in buffer:
+        buffer[name] = []
+
+
+def close_export_partitions(exporter, before=None):
+    """
+    Write out the buffered rows of every day before `before` (a partition
+    name such as "date=2026-02-14") and close those days' files.
+    With before=None every day is written and closed.
+    """
+    for key in list(exporter["buffers"]):
+        table, partition = key
+        if before is None or partition < before:
+            flush_export_buffer(exporter, table, partition)
+            del exporter["buffers"][key]
+
+    for key in list(exporter["writers"]):
+        table, partition = key
+        if before is None or partition < before:
+            exporter["writers"].pop(key).close()
+
+
+def close_exporter(exporter):
+    """Write every remaining buffered row and close all open files."""
+    close_export_partitions(exporter)
+    exporter["buffered_rows"] = 0
+
+
+# ============================================================================
+# SECTION 17: TOPIC MASTERY
+# ============================================================================
+# Bayesian knowledge tracing (BKT) estimates, for each player and topic, the
+# probability that the player has mastered the topic. Every answer updates
+# the estimate:
+#   1. A correct answer raises it (unless it was a lucky guess), a wrong
+#      answer lowers it (unless it was a slip).
+#   2. Each question is also a chance to learn, so it then moves a little
+#      towards mastered.
+# The model keeps one array of probabilities per topic, indexed by student
+# number, so a class of 100,000 students is a few small arrays. Answers are
+# applied in batches: a batch is grouped by topic and each topic's array is
+# updated in one tight loop.
+# main() loads the model from CHECKPOINT_DIR at startup and saves it after
+# every quiz, so mastery carries over from one run of the program to the next.
+# ============================================================================
+
+MASTERY_PARAMS = {
+    "p_init": 0.3,    # Chance a player already knows a topic before answering
+    "p_learn": 0.15,  # Chance of learning the topic from one question
+    "p_slip": 0.1,    # Chance of a wrong answer despite knowing the topic
+    "p_guess": 0.25   # Chance of guessing right (1 in 4 options)
+}
+MASTERY_THRESHOLD = 0.95   # Mastery probability at which a topic counts as mastered
+MASTERY_VERSION = 1        # Bump if the saved model layout changes
+MASTERY_FILE = "mastery.marshal"   # Kept in CHECKPOINT_DIR; None keeps mastery in memory only
+
+
+def create_mastery_model(params=None):
+    """
+    Create an empty mastery model.
+
+    Parameters:
+        params : BKT probabilities like MASTERY_PARAMS (default MASTERY_PARAMS)
+
+    Returns:
+        The model dictionary used by the other mastery functions.
+    """
+    return {
+        "params": dict(MASTERY_PARAMS if params is None else params),
+        "students": {},   # Player name -> student number
+        "names": [],      # Student number -> player name
+        "mastery": {},    # Topic -> array("d") of mastery probabilities
+        "attempts": {}    # Topic -> array("I") of questions answered
+    }
+
+
+def _mastery_student(model, player_name):
+    """Return a player's student number, adding the player if they are new."""
+    student = model["students"].get(player_name)
+    if student is None:
+        student = len(model["names"])
+        model["students"][player_name] = student
+        model["names"].append(player_name)
+        for topic in model["mastery"]:
+            model["mastery"][topic].append(model["params"]["p_init"])
+            model["attempts"][topic].append(0)
+    return student
+
+
+def _mastery_topic(model, topic):
+    """Return a topic's (mastery, attempts) arrays, adding the topic if it is new."""
+    if topic not in model["mastery"]:
+        student_count = len(model["names"])
+        model["mastery"][topic] = array("d", [model["params"]["p_init"]]) * student_count
+        model["attempts"][topic] = array("I", [0]) * student_count
+    return model["mastery"][topic], model["attempts"][topic]
+
+
+def update_mastery(model, observations):
+    """
+    Apply a batch of answers to the mastery model.
+
+    Parameters:
+        model        : A model from create_mastery_model()
+        observations : Iterable of (player_name, topic, is_correct) in the
+                       order the answers were given
+    """
+    # Group the batch by topic - each topic is then one column to update
+    batches = {}
+    for player_name, topic, is_correct in observations:
+        student = _mastery_student(model, player_name)
+        if topic not in batches:
+            batches[topic] = ([], [])
+        batches[topic][0].append(student)
+        batches[topic][1].append(is_correct)
+
+    params = model["params"]
+    p_learn = params["p_learn"]
+    p_slip = params["p_slip"]
+    p_guess = params["p_guess"]
+    p_no_slip = 1 - p_slip
+    p_no_guess = 1 - p_guess
+
+    for topic, (students, outcomes) in batches.items():
+        mastery, attempts = _mastery_topic(model, topic)
+        for student, is_correct in zip(students, outcomes):
+            known = mastery[student]
+            # Probability the topic was known, given this answer
+            if is_correct:
+                known = known * p_no_slip / (known * p_no_slip + (1 - known) * p_guess)
+            else:
+                known = known * p_slip / (known * p_slip + (1 - known) * p_no_guess)
+            # Chance to learn the topic from the question
+            mastery[student] = known + (1 - known) * p_learn
+            attempts[student] += 1
+
+
+def record_observations(record):
+    """Yield (player_name, topic, is_correct) for each answer in a SessionRecord."""
+    question_bank = get_question_bank()
+    for position in range(len(record.answers)):
+        topic = question_bank[record.question_ids[position]]["topic"]
+        yield record.player, topic, record_is_correct(record, position)
+
+
+def update_mastery_from_records(model, records):
+    """Apply every answer in a list of SessionRecords to the mastery model."""
+    for record in records:
+        update_mastery(model, record_observations(record))
+
+
+def player_mastery(model, player_name):
+    """
+    Return {topic: mastery probability} for the topics a player has answered.
+    Unknown players get an empty dictionary.
+    """
+    student = model["students"].get(player_name)
+    if student is None:
+        return {}
+
+    result = {}
+    for topic, mastery in model["mastery"].items():
+        if model["attempts"][topic][student] > 0:
+            result[topic] = mastery[student]
+    return result
+
+
+def weakest_topics(model, player_name, count=3):
+    """
+    Return a player's least mastered topics.
+
+    Parameters:
+        model       : A model from create_mastery_model()
+        player_name : The player to look up
+        count       : How many topics to return
+
+    Returns:
+        List of (topic, mastery probability), weakest first. Topics the player
+        has not answered yet, and mastered topics, are left out.
+    """
+    candidates = []
+    for topic, probability in player_mastery(model, player_name).items():
+        if probability < MASTERY_THRESHOLD:
+            candidates.append((probability, topic))
+
+    return [(topic, probability) for probability, topic in heapq.nsmallest(count, candidates)]
+
+
+def class_heat_map(model, players=None, bands=5):
+    """
+    Count how many students fall into each mastery band, per topic.
+
+    Parameters:
+        model   : A model from create_mastery_model()
+        players : Player names to include, or None for every student
+        bands   : Number of equal-width mastery bands (0-20%, 20-40%, ...)
+
+    Returns:
+        Dictionary of topic -> list of student counts, lowest band first.
+        Students who have not answered a topic are not counted for it.
+    """
+    if players is None:
+        students = None
+    else:
+        students = [model["students"][name] for name in players if name in model["students"]]
+
+    heat_map = {}
+    for topic, mastery in model["mastery"].items():
+        attempts = model["attempts"][topic]
+        counts = [0] * bands
+        if students is None:
+            values = [p for p, tries in zip(mastery, attempts) if tries > 0]
+        else:
+            values = [mastery[s] for s in students if attempts[s] > 0]
+        for probability in values:
+            # Mastery of exactly 1.0 belongs in the top band
+            counts[min(int(probability * bands), bands - 1)] += 1
+        heat_map[topic] = counts
+    return heat_map
+
+
+def display_class_heat_map(model, players=None, bands=5):
+    """
+    Print the class heat map, shading each cell by its share of the students.
+    Empty cells are blank, and darker shades mean more of the class.
+    """
+    heat_map = class_heat_map(model, players, bands)
+    if len(heat_map) == 0:
+        print("\n  No answers recorded yet.")
+        return
+
+    shades = " .:*#"
+    band_width = 100 // bands
+
+    print("\n" + "=" * 60)
+    print("  CLASS MASTERY HEAT MAP")
+    print("=" * 60)
+    header = "".join(f"{band * band_width:>3}%+" for band in range(bands))
+    print(f"  {'Topic':<20}{header}  Students")
+    print("  " + "-" * 50)
+    for topic in sorted(heat_map):
+        counts = heat_map[topic]
+        students = sum(counts)
+        cells = ""
+        for count in counts:
+            shade = 0
+            if count > 0:
+                shade = 1 + min(int(count / students * (len(shades) - 1)), len(shades) - 2)
+            cells += " " + shades[shade] * 4
+        print(f"  {topic:<20}{cells}  {students}")
+    print("=" * 60)
+
+
+def save_mastery(model, path):
+    """
+    Save a mastery model to a file so it can be used in later sessions.
+    The model is written to a temporary file first and then renamed, so a
+    crash never leaves a half-written model behind.
+    """
+    data = {
+        "version": MASTERY_VERSION,
+        "params": model["params"],
+        "names": model["names"],
+        "mastery": {topic: values.tobytes() for topic, values in model["mastery"].items()},
+        "attempts": {topic: values.tobytes() for topic, values in model["attempts"].items()}
+    }
+    directory = os.path.dirname(path)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as model_file:
+        model_file.write(marshal.dumps(data))
+    os.replace(temp_path, path)
+
+
+def load_mastery(path):
+    """
+    Load a mastery model saved by save_mastery().
+
+    Returns:
+        The model, or None if the file is missing or from another version.
+    """
+    try:
+        with open(path, "rb") as model_file:
+            data = marshal.loads(model_file.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != MASTERY_VERSION:
+        return None
+
+    model = create_mastery_model(data["params"])
+    model["names"] = data["names"]
+    model["students"] = {name: student for student, name in enumerate(data["names"])}
+    for topic, raw in data["mastery"].items():
+        model["mastery"][topic] = array("d", raw)
+        model["attempts"][topic] = array("I", data["attempts"][topic])
+    return model
+
+
+# ============================================================================
+# SECTION 18: QUESTION PRESENTATION
+# ============================================================================
+# Everything ask_question() shows that depends only on the question or the
+# teaching mode is worked out once, when the quiz data is first used:
+#   - QuestionView : the topic/difficulty line, question text and options as
+#                    one block, the hint, the answer letter and its index, and
+#                    the "incorrect" and explanation lines
+#   - ModeView     : the mode's settings with its feedback behavior as a
+#                    number, so asking a question never compares dictionaries
+# Views are read-only tuples shared by every session, so serving a question
+# is just printing ready-made text.
+# ============================================================================
+
+QuestionView = namedtuple("QuestionView", [
+    "question",          # The question dictionary from the question bank
+    "body",              # Topic line, separator, question text and options
+    "hint_line",         # Hint shown in hint modes, or None for easy questions
+    "answer",            # Correct answer letter, e.g. "B"
+    "answer_index",      # Position of the correct option in "options"
+    "incorrect_line",    # Feedback for a wrong answer
+    "explanation_line"   # Explanation shown in modes that show explanations
+])
+
+ModeView = namedtuple("ModeView", [
+    "settings",          # The teaching mode dictionary (used by get_answer)
+    "feedback",          # FEEDBACK_STANDARD or FEEDBACK_ENCOURAGING
+    "show_hints",
+    "show_explanation"
+])
+
+FEEDBACK_STANDARD = 0      # Plain correct/incorrect feedback
+FEEDBACK_ENCOURAGING = 1   # Extra encouragement after every answer (Recovery Mode)
+FEEDBACK_STYLES = {"standard": FEEDBACK_STANDARD, "encouraging": FEEDBACK_ENCOURAGING}
+DIFFICULTY_LABELS = {1: "Easy", 2: "Medium"}   # Anything else is "Hard"
+
+_question_views = None   # Built on first use by get_question_views()
+_mode_views = None       # Built on first use by get_mode_views()
+
+
+def compile_question_view(question):
+    """Build the ready-to-print QuestionView for one question dictionary."""
+    difficulty = DIFFICULTY_LABELS.get(question["difficulty"], "Hard")
+    lines = [
+        f"  Topic: {question['topic']} | Difficulty: {difficulty}",
+        "-" * 60,
+        f"\n  {question['q']}\n"
+    ]
+    for option in question["options"]:
+        lines.append(f"    {option}")
+
+    # Find the correct option once, e.g. "B) Artificial Intelligence"
+    answer_index = None
+    for index, option in enumerate(question["options"]):
+        if option.startswith(question["ans"] + ")"):
+            answer_index = index
+            break
+
+    # Hints are only given for medium and hard questions
+    hint_line = None
+    if question["difficulty"] >= 2 and answer_index is not None:
+        hint_text = question["options"][answer_index][3:].strip()  # Remove "X) " prefix
+        # Give a partial hint - first few characters
+        hint_preview = hint_text[:max(3, len(hint_text) // 3)]
+        hint_line = f"\n  Hint: The answer starts with \"{hint_preview}...\""
+
+    return QuestionView(
+        question=question,
+        body="\n".join(lines),
+        hint_line=hint_line,
+        answer=question["ans"],
+        answer_index=answer_index,
+        incorrect_line=f"\n  INCORRECT. The correct answer was: {question['ans']}",
+        explanation_line=f"\n  Explanation: {question['explanation']}"
+    )
+
+
+def compile_mode_view(mode_settings):
+    """Build the ModeView for one teaching mode dictionary."""
+    return ModeView(
+        settings=mode_settings,
+        feedback=FEEDBACK_STYLES[mode_settings.get("feedback", "standard")],
+        show_hints=mode_settings["show_hints"],
+        show_explanation=mode_settings["show_explanation"]
+    )
+
+
+def get_question_views():
+    """Return a QuestionView for every question, in question bank order."""
+    global _question_views
+    if _question_views is None:
+        _question_views = [compile_question_view(question) for question in get_question_bank()]
+    return _question_views
+
+
+def get_mode_views():
+    """Return {mode number: ModeView} for every teaching mode."""
+    global _mode_views
+    if _mode_views is None:
+        _mode_views = {mode_num: compile_mode_view(mode_settings)
+                       for mode_num, mode_settings in get_teaching_modes().items()}
+    return _mode_views
+
+
+# ============================================================================
+# SECTION 19: MAIN MENU & GAME LOOP
+# ============================================================================
+# The main() function is the entry point. It shows the main menu, handles
+# navigation between quiz, leaderboard, and settings, and manages the
+# overall game loop using a while loop.
+# ============================================================================
+
+def main():
+    """
+    Main entry point for the Learnova Quiz Engine.
+    Displays the main menu and handles the game loop.
+    Uses a while loop that continues until the player chooses to exit.
+    """
+    # Display welcome banner
+    print_banner()
+
+    # Get player name
+    player_name = get_player_name()
+    print(f"\n  Welcome, {player_name}! Ready to learn?")
+
+    # Initialize persistent data
+    leaderboards = create_leaderboards()   # Ranked boards (persist across rounds)
+    play_count = 0     # Track how many times the player has played
+
+    # Topic mastery carries over between runs when checkpoints are enabled
+    mastery_path = None
+    mastery = None
+    if CHECKPOINT_DIR is not None and MASTERY_FILE is not None:
+        mastery_path = os.path.join(CHECKPOINT_DIR, MASTERY_FILE)
+        mastery = load_mastery(mastery_path)
+    if mastery is None:
+        mastery = create_mastery_model()
+
+    # Export finished sessions if an export folder is configured
+    exporter = None
+    if EXPORT_DIR is not None:
+        exporter = create_exporter(EXPORT_DIR)
+
+    # Buffered export rows are written out however the program ends
+    try:
+        # Offer to finish a quiz that was interrupted last time
+        checkpoint_path = None
+        if CHECKPOINT_DIR is not None:
+            checkpoint_path = checkpoint_path_for(player_name)
+            saved = load_checkpoint(checkpoint_path)
+            if saved is not None:
+                answered = len(saved["answers"])
+                total = len(saved["question_ids"])
+                if answered == total:
+                    # Every answer was saved but the program stopped before scoring
+                    print(f"\n  Your last quiz ({answered}/{total} answered) was never scored. Scoring it now.")
+                    resume_input = "y"
+                else:
+                    resume_input = read_input(f"\n  You have an unfinished quiz ({answered}/{total} answered). Resume? (y/n): ").strip().lower()
+
+                if resume_input == "y":
+                    play_count = saved["play_count"]
+                    record = run_quiz(player_name, saved["mode_num"], total, play_count,
+                                      checkpoint_path, resume=saved, leaderboards=leaderboards,
+                                      mastery=mastery)
+                    if mastery_path is not None:
+                        save_mastery(mastery, mastery_path)
+                    if exporter is not None:
+                        export_session(exporter, record)
+                else:
+                    clear_checkpoint(checkpoint_path)
+
+        # ---- MAIN MENU LOOP ----
+        running = True
+        while running:
+            print("\n" + "=" * 60)
+            print("  MAIN MENU")
+            print("=" * 60)
+            print("\n  1. Start New Quiz")
+            print("  2. View Leaderboard")
+            print("  3. About Learnova")
+            print("  4. Exit")
+            print_separator()
+
+            choice = read_input("\n  Select option (1-4): ").strip()
+
+            if choice == "1":
+                # Start a new quiz
+                mode_num = get_teaching_mode()
+                play_count += 1
+
+                # Ask how many questions
+                bank_size = len(get_question_bank())
+                print(f"\n  Available questions: {bank_size}")
+                q_count_input = read_input(f"  How many questions? (1-{bank_size}, Enter for 10): ").strip()
+
+                if q_count_input == "":
+                    num_questions = 10
+                elif q_count_input.isdigit() and 1 <= int(q_count_input) <= bank_size:
+                    num_questions = int(q_count_input)
+                else:
+                    print("  Invalid number. Using 10 questions.")
+                    num_questions = 10
+
+                # A classroom code puts everyone on the same balanced form
+                class_code = read_input("  Classroom code (Enter to skip): ").strip()
+                question_ids = None
+                if class_code.isdigit():
+                    form = build_quiz_form(int(class_code), num_questions)
+                    question_ids = student_form(form, player_name, int(class_code))
+                elif class_code != "":
+                    print("  Classroom codes are numbers. Using random questions.")
+
+                # Run the quiz - the session is added to the leaderboards and mastery
+                record = run_quiz(player_name, mode_num, num_questions, play_count,
+                                  checkpoint_path, question_ids=question_ids,
+                                  leaderboards=leaderboards, mastery=mastery)
+                if mastery_path is not None:
+                    save_mastery(mastery, mastery_path)
+                if exporter is not None:
+                    export_session(exporter, record)
+
+            elif choice == "2":
+                # View leaderboard - all-time by default, or a time window or mode
+                board_input = read_input("\n  Board: 1) All-Time  2) Today  3) This Week  4) By Mode (Enter for All-Time): ").strip()
+
+                if board_input == "2":
+                    display_leaderboard(leaderboards["daily"])
+                elif board_input == "3":
+                    display_leaderboard(leaderboards["weekly"])
+                elif board_input == "4":
+                    mode_num = get_teaching_mode()
+                    display_leaderboard(mode_leaderboard(leaderboards, get_teaching_modes()[mode_num]["name"]))
+                else:
+                    display_leaderboard(leaderboards["all_time"])
+
+            elif choice == "3":
+                # About section
+                print("\n" + "=" * 60)
+                print("  ABOUT LEARNOVA")
+                print("=" * 60)
+                print("""
+  Learnova is an AI-powered education platform that transforms
+  any lecture material into gamified, engaging lesson plans in
+  seconds.
+
+  The full platform (built with React, Node.js, and TypeScript)
+  allows teachers to:
+    - Upload any lecture material (PDF, PPTX, DOCX, text)
+    - Select a Teaching Mode for their classroom dynamic
+    - Get AI-generated gamified lesson plans in under 60 seconds
+    - Run live quizzes where students join from their phones
+    - Track progress with XP, badges, and leaderboards
+
+  This Python version demonstrates the core quiz engine and
+  gamification system that powers the full Learnova platform.
+
+  Built by: Ghaleb, Hala, Feyza
+  Course: Programming Fundamentals | February 2026
+            """)
+                print("=" * 60)
+
+            elif choice == "4":
+                # Exit
+                print(f"\n  Thanks for playing, {player_name}!")
+                print("  Keep learning, keep growing.")
+                print("  Powered by Learnova\n")
+                running = False
+
+            else:
+                print("  Invalid option. Please enter 1, 2, 3, or 4.")
+
+    finally:
+        if exporter is not None:
+            close_exporter(exporter)
+
+
+# ============================================================================
+# SECTION 20: PROGRAM ENTRY POINT
+# ============================================================================
+# This is the standard Python entry point. The if __name__ == "__main__"
+# check ensures main() only runs when this file is executed directly,
+# not when it is imported as a module.
+# ============================================================================
+
+if __name__ == "__main__":
+    if "--grade" in sys.argv:
+        run_grader_command(sys.argv[sys.argv.index("--grade") + 1:])
+    elif "--record" in sys.argv:
+        record_trace(sys.argv[sys.argv.index("--record") + 1])
+    elif "--replay" in sys.argv:
+        run_replay_command(sys.argv[sys.argv.index("--replay") + 1])
+    elif "--export" in sys.argv:
+        EXPORT_DIR = sys.argv[sys.argv.index("--export") + 1]
+        main()
+    else:
+        main()